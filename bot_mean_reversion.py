@@ -1,335 +1,876 @@
-import ccxt
-import pandas as pd
+import ccxt.pro as ccxtpro
 import numpy as np
+import math
+import asyncio
+import json
+import logging
+import queue
 import time
-from datetime import datetime
 import sys
 import os
-from dotenv import load_dotenv
+from collections import deque, namedtuple
+from logging.handlers import QueueHandler, QueueListener
+from numba import njit, prange
+
+# orjson decode JSON เร็วกว่า stdlib 2-5 เท่า — ccxt parse response ทุก REST call
+# ผ่าน json.loads ดังนั้น patch ทีเดียวได้ผลทั้ง fetch_ohlcv/fetch_balance/order
+# rebind เฉพาะชื่อ `json` ที่ module ของ ccxt มองเห็น — ห้ามแก้ stdlib json
+# ตรง ๆ เพราะ library อื่นทั้ง process จะพังตาม (json.load ที่ส่ง kwargs,
+# dumps ที่ใช้ default=/indent= ฯลฯ)
+# (optional: ไม่ได้ติดตั้งก็วิ่งด้วย stdlib json ตามเดิม)
+try:
+    import orjson
+    import json as _stdlib_json
+    import types as _types
+    import ccxt.base.exchange as _ccxt_base
+    _ccxt_base.json = _types.SimpleNamespace(
+        loads=orjson.loads,
+        dumps=lambda obj, **kw: orjson.dumps(obj).decode(),
+        JSONDecodeError=_stdlib_json.JSONDecodeError,
+    )
+except ImportError:
+    pass
 
 # ---------------------------------------------------------
-# 1. CONFIGURATION (โหลดจาก .env file)
+# 0. LOGGING (bounded queue — อย่าให้ stdout flush มา block เส้นทางส่ง order)
 # ---------------------------------------------------------
-load_dotenv()
+# logger.info() แค่ push record ลง queue (sub-µs) แล้ว thread ของ QueueListener
+# เป็นคน format + เขียน stdout — syscall ไม่แทรกกลาง decision→order อีก
+# รายละเอียดราย tick อยู่ระดับ DEBUG (เปิดด้วย LOG_LEVEL=DEBUG)
+logger = logging.getLogger('mr')
+
+def setup_logging():
+    logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
 
-# API Credentials
-API_KEY = os.getenv('API_KEY', 'YOUR_BINANCE_API_KEY')
-API_SECRET = os.getenv('API_SECRET', 'YOUR_BINANCE_SECRET_KEY')
+    log_queue = queue.Queue(maxsize=10000)  # bounded กันหน่วยความจำบวมถ้า drain ไม่ทัน
+    logger.addHandler(QueueHandler(log_queue))
 
-# Trading Configuration
-SYMBOL = os.getenv('SYMBOL', 'BNB/USDT')
-TIMEFRAME = os.getenv('TIMEFRAME', '15m')
-LIMIT = int(os.getenv('LIMIT', '100'))
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(
+        '%(asctime)s | %(levelname)-8s | %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
 
-# Strategy Parameters
-Z_SCORE_WINDOW = int(os.getenv('Z_SCORE_WINDOW', '20'))
-ENTRY_THRESHOLD = float(os.getenv('ENTRY_THRESHOLD', '2.0'))
-EXIT_THRESHOLD = float(os.getenv('EXIT_THRESHOLD', '0.5'))
+    listener = QueueListener(log_queue, console_handler)
+    listener.start()
+    return listener
+
+# ---------------------------------------------------------
+# 1. CONFIGURATION (โหลดจาก .env file)
+# ---------------------------------------------------------
+def _load_env(path='.env'):
+    """อ่าน .env เองครั้งเดียว (KEY=VALUE ต่อบรรทัด) — ตัด dependency python-dotenv
 
-# Risk Management
-RISK_PER_TRADE = float(os.getenv('RISK_PER_TRADE', '0.01'))
-STOP_LOSS_PCT = float(os.getenv('STOP_LOSS_PCT', '0.02'))
-MAX_LEVERAGE = int(os.getenv('MAX_LEVERAGE', '10'))
+    ตัวแปรจาก shell environment ชนะค่าในไฟล์ เหมือน load_dotenv() เดิม
+    """
+    env = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#') or '=' not in line:
+                    continue
+                key, _, value = line.partition('=')
+                env[key.strip()] = value.split('#', 1)[0].strip().strip('\'"')
+    except FileNotFoundError:
+        pass
+    env.update(os.environ)
+    return env
+
+# Config ทั้งหมดรวมเป็น namedtuple เดียว — cast type ครั้งเดียวตอน import
+# แล้ว freeze (อ่านผ่าน attribute ไม่มีใครแก้กลางทางได้)
+Config = namedtuple('Config', [
+    'API_KEY', 'API_SECRET', 'SYMBOL', 'SYMBOLS', 'TIMEFRAME', 'LIMIT',
+    'Z_SCORE_WINDOW', 'ENTRY_THRESHOLD', 'EXIT_THRESHOLD',
+    'RISK_PER_TRADE', 'STOP_LOSS_PCT', 'MAX_LEVERAGE', 'USE_WEBSOCKET',
+])
+
+_env = _load_env()
+CFG = Config(
+    API_KEY=_env.get('API_KEY', 'YOUR_BINANCE_API_KEY'),
+    API_SECRET=_env.get('API_SECRET', 'YOUR_BINANCE_SECRET_KEY'),
+    SYMBOL=_env.get('SYMBOL', 'BNB/USDT'),
+    # เทรดหลายเหรียญพร้อมกันได้ด้วย SYMBOLS=BNB/USDT,ETH/USDT (default = SYMBOL เดียว)
+    SYMBOLS=tuple(s.strip() for s in
+                  _env.get('SYMBOLS', _env.get('SYMBOL', 'BNB/USDT')).split(',')
+                  if s.strip()),
+    TIMEFRAME=_env.get('TIMEFRAME', '15m'),
+    LIMIT=int(_env.get('LIMIT', '100')),
+    Z_SCORE_WINDOW=int(_env.get('Z_SCORE_WINDOW', '20')),
+    ENTRY_THRESHOLD=float(_env.get('ENTRY_THRESHOLD', '2.0')),
+    EXIT_THRESHOLD=float(_env.get('EXIT_THRESHOLD', '0.5')),
+    RISK_PER_TRADE=float(_env.get('RISK_PER_TRADE', '0.01')),
+    STOP_LOSS_PCT=float(_env.get('STOP_LOSS_PCT', '0.02')),
+    MAX_LEVERAGE=int(_env.get('MAX_LEVERAGE', '10')),
+    # Data Feed (websocket push แทน REST polling; ปิดได้ถ้าเน็ตเวิร์คไม่รองรับ)
+    USE_WEBSOCKET=_env.get('USE_WEBSOCKET', '1') == '1',
+)
+del _env
+
+# Alias ชื่อเดิมชี้เข้า CFG — โค้ดส่วนอื่นอ่านชื่อสั้นเหมือนเดิม
+API_KEY = CFG.API_KEY
+API_SECRET = CFG.API_SECRET
+SYMBOL = CFG.SYMBOL
+SYMBOLS = CFG.SYMBOLS
+TIMEFRAME = CFG.TIMEFRAME
+LIMIT = CFG.LIMIT
+Z_SCORE_WINDOW = CFG.Z_SCORE_WINDOW
+ENTRY_THRESHOLD = CFG.ENTRY_THRESHOLD
+EXIT_THRESHOLD = CFG.EXIT_THRESHOLD
+RISK_PER_TRADE = CFG.RISK_PER_TRADE
+STOP_LOSS_PCT = CFG.STOP_LOSS_PCT
+MAX_LEVERAGE = CFG.MAX_LEVERAGE
+USE_WEBSOCKET = CFG.USE_WEBSOCKET
+
+def _timeframe_seconds(tf):
+    """แปลง TIMEFRAME string เป็นวินาที (parse ครั้งเดียวตอน import)"""
+    unit = tf[-1]
+    value = int(tf[:-1])
+    return value * {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}.get(unit, 60)
+
+TF_SEC = _timeframe_seconds(TIMEFRAME)
+
+# Shared exchange instance (สร้างครั้งเดียวใน main() แล้วใช้ร่วมกันทุก coroutine)
+exchange = None
+
+# Market metadata cache (ค่าคงที่ตลอดอายุ Bot — cache ครั้งเดียวตอน start
+# แทนการเรียก exchange.market()/amount_to_precision() ทุก tick)
+MARKET_META = {}
+
+# Specialized rounders ต่อ symbol (สร้างด้วย exec ตอน start — ดูด้านล่าง)
+_ROUND_AMOUNT = {}
+_ROUND_PRICE = {}
+
+def _decimals_of(step):
+    """จำนวนทศนิยมของ step/tick (ไว้ตัด floating-point noise หลังคูณ)"""
+    return max(0, int(round(-math.log10(step)))) if step < 1 else 0
+
+def cache_market_metadata():
+    """อ่าน precision/limits ของทุก symbol จาก markets ที่โหลดแล้วมาเก็บเป็น constant
+
+    step/tick ของแต่ละ symbol คงที่ตลอดอายุ Bot จึง generate closure
+    เฉพาะทางด้วย exec โดย bake ค่าเป็น literal — เหลือ div+mul เดียวต่อ call
+    แทน generic dispatch ของ ccxt decimal_to_precision (partial evaluation)
+    """
+    for symbol in SYMBOLS:
+        market = exchange.market(symbol)
+        amount_step = float(market['precision']['amount'])
+        price_tick = float(market['precision']['price'])
+        MARKET_META[symbol] = {
+            'market': market,
+            'min_amount': market['limits']['amount']['min'],
+            'amount_step': amount_step,
+        }
+
+        ns = {}
+        src = (
+            f"def round_amount(x):\n"
+            f"    return round(({amount_step!r}) * int(x / ({amount_step!r})), {_decimals_of(amount_step)})\n"
+            f"def round_price(x):\n"
+            f"    return round(({price_tick!r}) * int(x / ({price_tick!r})), {_decimals_of(price_tick)})\n"
+        )
+        exec(src, ns)
+        _ROUND_AMOUNT[symbol] = ns['round_amount']
+        _ROUND_PRICE[symbol] = ns['round_price']
+
+def _round_amount(symbol, x):
+    """ปัดจำนวนเหรียญลงให้เข้า Lot Size โดยไม่ต้องผ่าน ccxt precision helper"""
+    return _ROUND_AMOUNT[symbol](x)
 
 # ---------------------------------------------------------
 # IMPROVEMENT 1: Exchange Initialization with Leverage & Margin Setup
 # ---------------------------------------------------------
-def initialize_exchange():
-    """เชื่อมต่อ Binance Futures และตั้งค่า Leverage + Margin Mode"""
-    exchange = ccxt.binance({
+async def _select_fastest_endpoint(ex):
+    """Probe fapi/fapi1..fapi4 แล้วล็อค endpoint ที่ RTT ต่ำสุด
+
+    Binance มีหลาย fapi cluster — ระยะทาง network ต่างกันได้หลายสิบ ms
+    ต่อ RTT ซึ่งทบเข้าทุก order ที่ส่ง วัดด้วย fetch_time ครั้งเดียวตอน start
+    (รัน Bot ใกล้ ๆ AWS ap-northeast-1 จะได้ผลสุด)
+    """
+    default_host = 'fapi.binance.com'
+    fapi_urls = {k: v for k, v in ex.urls['api'].items()
+                 if isinstance(v, str) and default_host in v}
+    if not fapi_urls:
+        return
+
+    def _set_host(host):
+        for key, url in fapi_urls.items():
+            ex.urls['api'][key] = url.replace(default_host, host)
+
+    best_host = default_host
+    best_rtt = float('inf')
+    for host in (default_host, 'fapi1.binance.com', 'fapi2.binance.com',
+                 'fapi3.binance.com', 'fapi4.binance.com'):
+        _set_host(host)
+        try:
+            start = time.monotonic()
+            await ex.fetch_time()
+            rtt = time.monotonic() - start
+        except Exception:
+            continue
+        if rtt < best_rtt:
+            best_host, best_rtt = host, rtt
+
+    _set_host(best_host)
+    logger.info(f"✅ Endpoint: {best_host} ({best_rtt*1000:.0f}ms RTT)")
+
+
+async def initialize_exchange():
+    """เชื่อมต่อ Binance Futures (ccxt.pro) และตั้งค่า Leverage + Margin Mode"""
+    ex = ccxtpro.binance({
         'apiKey': API_KEY,
         'secret': API_SECRET,
         'options': {'defaultType': 'future'},
-        'enableRateLimit': True
+        'enableRateLimit': True,
+        # บังคับ keep-alive — Bot คุยกับ host เดียว (fapi.binance.com)
+        # การ reuse connection ตัด TLS handshake (~50-100ms) ออกจากทุก call
+        'headers': {'Connection': 'keep-alive'},
     })
 
-    print("=" * 60)
-    print("🔧 INITIALIZING BINANCE FUTURES")
-    print("=" * 60)
+    logger.info("=" * 60)
+    logger.info("🔧 INITIALIZING BINANCE FUTURES")
+    logger.info("=" * 60)
 
     try:
-        # Load markets
-        exchange.load_markets()
-        print(f"✅ Markets loaded")
-
-        # Set Leverage
+        # เลือก fapi endpoint ที่ latency ต่ำสุดก่อนยิง call อื่น
         try:
-            exchange.set_leverage(MAX_LEVERAGE, SYMBOL)
-            print(f"✅ Leverage set to {MAX_LEVERAGE}x for {SYMBOL}")
+            await _select_fastest_endpoint(ex)
         except Exception as e:
-            print(f"⚠️ Leverage setting: {e}")
+            logger.warning(f"⚠️ Endpoint probe failed: {e} (using default)")
 
-        # Set Margin Mode to ISOLATED
-        try:
-            exchange.set_margin_mode('ISOLATED', SYMBOL)
-            print(f"✅ Margin mode set to ISOLATED for {SYMBOL}")
-        except Exception as e:
-            print(f"⚠️ Margin mode: {e} (may already be set)")
+        # Load markets
+        await ex.load_markets()
+        logger.info(f"✅ Markets loaded")
+
+        for symbol in SYMBOLS:
+            # Set Leverage
+            try:
+                await ex.set_leverage(MAX_LEVERAGE, symbol)
+                logger.info(f"✅ Leverage set to {MAX_LEVERAGE}x for {symbol}")
+            except Exception as e:
+                logger.warning(f"⚠️ Leverage setting: {e}")
+
+            # Set Margin Mode to ISOLATED
+            try:
+                await ex.set_margin_mode('ISOLATED', symbol)
+                logger.info(f"✅ Margin mode set to ISOLATED for {symbol}")
+            except Exception as e:
+                logger.warning(f"⚠️ Margin mode: {e} (may already be set)")
+
+        # Warm-up: เปิด TCP/TLS connection ทิ้งไว้ก่อนเข้า loop
+        # order แรกจะได้ไม่ต้องจ่ายค่า handshake เต็ม ๆ
+        await ex.fetch_time()
+        logger.info(f"✅ Connection warmed up (keep-alive)")
 
-        print("=" * 60)
+        logger.info("=" * 60)
 
     except Exception as e:
-        print(f"❌ CRITICAL: Exchange initialization failed: {e}")
+        logger.error(f"❌ CRITICAL: Exchange initialization failed: {e}")
+        await ex.close()
         sys.exit(1)
 
-    return exchange
-
-# Initialize exchange with leverage and margin setup
-exchange = initialize_exchange()
+    return ex
 
 # ---------------------------------------------------------
 # 2. DATA FEED & INDICATORS (ส่วนคำนวณ)
 # ---------------------------------------------------------
-def fetch_data(symbol, timeframe, limit):
-    """ดึงข้อมูลแท่งเทียน OHLCV จาก Binance"""
+async def fetch_data(symbol, timeframe, limit):
+    """ดึงข้อมูลแท่งเทียน OHLCV จาก Binance
+
+    คืนค่า (closes, last_ts_ms) เป็น NumPy array ตรง ๆ — downstream ใช้แค่
+    ราคาปิดกับ timestamp ล่าสุด การสร้าง DataFrame 6 คอลัมน์ + to_datetime
+    ทุกนาทีเป็น overhead ล้วน ๆ เทียบกับคณิตศาสตร์ 20 ค่าที่ทำจริง
+    """
     try:
-        bars = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-        df = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df
+        bars = await exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        arr = np.asarray(bars, dtype=np.float64)
+        return arr[:, 4], arr[-1, 0]
     except Exception as e:
-        print(f"Error fetching data: {e}")
+        logger.error(f"Error fetching data: {e}")
+        return None, None
+
+async def fetch_bars(symbol, timeframe, limit):
+    """ดึง OHLCV ดิบ (มี timestamp ครบ) สำหรับเติม ring buffer ทีละแท่ง"""
+    try:
+        return await exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+    except Exception as e:
+        logger.error(f"Error fetching data: {e}")
         return None
 
-def calculate_z_score(df, window):
-    """คำนวณ Z-Score ทางสถิติ"""
-    # 1. หาค่าเฉลี่ย (Mean)
-    df['mean'] = df['close'].rolling(window=window).mean()
-    # 2. หาค่าเบี่ยงเบนมาตรฐาน (Std Dev)
-    df['std'] = df['close'].rolling(window=window).std()
-    # 3. สูตร Z-Score: (ราคา - ค่าเฉลี่ย) / Std Dev
-    df['z_score'] = (df['close'] - df['mean']) / df['std']
-    return df
+# Balance cache — ส่วนใหญ่ tick ไม่ได้เปิด Position การยิง fetch_balance
+# (REST เต็ม ๆ ~250ms) ทุกรอบจึงเปลืองเปล่า ใช้ค่า cache ภายใน TTL
+# และ invalidate ทันทีหลัง order สำเร็จ
+BALANCE_CACHE_TTL = 30  # seconds
+_balance_cache = {'value': None, 'ts': 0.0}
+
+def invalidate_balance_cache():
+    """บังคับ refresh balance รอบถัดไป (เรียกหลัง order สำเร็จ)"""
+    _balance_cache['value'] = None
+    _balance_cache['ts'] = 0.0
+
+async def fetch_usdt_balance():
+    """ดึงยอด USDT ว่างแบบ lazy (คืน 0 ถ้า error เพื่อไม่ให้เปิด Position)"""
+    if (_balance_cache['value'] is not None
+            and time.monotonic() - _balance_cache['ts'] < BALANCE_CACHE_TTL):
+        return _balance_cache['value']
+    try:
+        balance_info = await exchange.fetch_balance()
+        usdt_free = balance_info['USDT']['free']
+        _balance_cache['value'] = usdt_free
+        _balance_cache['ts'] = time.monotonic()
+        return usdt_free
+    except Exception as e:
+        logger.error(f"❌ Error fetching balance: {e}")
+        return 0
+
+@njit(cache=True)
+def last_zscore(closes, window):
+    """คำนวณ (z, mean, std) ของแท่งล่าสุดด้วย Welford (online mean/variance)
+
+    Bot ใช้แค่ค่าสถิติของ window ท้ายสุด จึงไม่ต้อง rolling ทั้ง Series แบบ
+    pandas (O(N*window) + allocate 2 columns) — วนแค่ window ค่าใน native code
+    และใช้สูตร Welford เพื่อเลี่ยง catastrophic cancellation ของ sum-of-squares
+    คืน mean/std ออกมาด้วยเพื่อให้ caller แปลง threshold เป็น price band ได้เลย
+    """
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(closes.shape[0] - window, closes.shape[0]):
+        x = closes[i]
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+    # ddof=1 ให้ตรงกับ pandas rolling().std() เดิม
+    std = math.sqrt(m2 / (window - 1))
+    if std == 0.0:
+        return 0.0, mean, std
+    return (closes[-1] - mean) / std, mean, std
+
+@njit(parallel=True, cache=True)
+def batch_signals(closes2d, window):
+    """คำนวณสถิติทุก symbol ในคราวเดียว (SoA: แถวละ symbol, คอลัมน์ละแท่ง)
+
+    แทนที่จะรัน Bot ทีละ process ต่อ symbol ใช้ buffer 2 มิติแล้วให้ Numba
+    กระจายงานข้ามแกน symbol ด้วย prange — สูตรเดียวกับ last_zscore ทุกแถว
+    """
+    n_sym = closes2d.shape[0]
+    zs = np.empty(n_sym, np.float64)
+    means = np.empty(n_sym, np.float64)
+    stds = np.empty(n_sym, np.float64)
+    for i in prange(n_sym):
+        n = 0
+        mean = 0.0
+        m2 = 0.0
+        for j in range(closes2d.shape[1] - window, closes2d.shape[1]):
+            x = closes2d[i, j]
+            n += 1
+            delta = x - mean
+            mean += delta / n
+            m2 += delta * (x - mean)
+        std = math.sqrt(m2 / (window - 1))
+        means[i] = mean
+        stds[i] = std
+        if std == 0.0:
+            zs[i] = 0.0
+        else:
+            zs[i] = (closes2d[i, -1] - mean) / std
+    return zs, means, stds
+
+# Action/Position enum สำหรับ decision kernel (int8 — branch native ล้วน)
+HOLD, OPEN_LONG, OPEN_SHORT, CLOSE_LONG, CLOSE_SHORT = 0, 1, 2, 3, 4
+POS_NONE, POS_LONG, POS_SHORT = 0, 1, 2
+_POS_INT = {None: POS_NONE, 'LONG': POS_LONG, 'SHORT': POS_SHORT}
+
+# ใส่ signature ชัด ๆ ให้ compile ตั้งแต่ตอน import (eager + cache บนดิสก์)
+# — tick แรกไม่เจอ JIT pause และ decision เหลือ compare+branch ระดับ native
+@njit('i1(f8, f8, f8, f8, f8, i1)', cache=True)
+def decide(price, mean, std, entry_k, exit_k, pos_type):
+    """State machine การตัดสินใจ: (ราคา, สถิติ, สถานะ) -> action enum
+
+    เทียบราคากับ band (mean ± k*std) ตรง ๆ สมมูลกับเทียบ z กับ k
+    แต่ไม่ต้องหารเลย
+    """
+    if pos_type == 0:  # POS_NONE
+        if price > mean + entry_k * std:
+            return 2  # OPEN_SHORT
+        if price < mean - entry_k * std:
+            return 1  # OPEN_LONG
+    elif pos_type == 2:  # POS_SHORT
+        if price < mean + exit_k * std:
+            return 4  # CLOSE_SHORT
+    else:  # POS_LONG
+        if price > mean - exit_k * std:
+            return 3  # CLOSE_LONG
+    return 0  # HOLD
 
 # ---------------------------------------------------------
 # 3. RISK MANAGEMENT (ส่วนบริหารความเสี่ยง)
 # ---------------------------------------------------------
-def calculate_position_size(symbol, current_price):
-    """คำนวณ Size อัตโนมัติตาม Fixed Fractional (Risk % ต่อเทรด)"""
-    try:
-        # 1. ดึง Balance USDT แบบ Real-time
-        balance_info = exchange.fetch_balance()
-        usdt_balance = balance_info['USDT']['free']
+def calculate_position_size(symbol, current_price, usdt_balance):
+    """คำนวณ Size อัตโนมัติตาม Fixed Fractional (Risk % ต่อเทรด)
 
+    Balance ถูก fetch แบบขนานกับ OHLCV ใน run_bot แล้วส่งเข้ามา
+    ฟังก์ชันนี้จึงเหลือแค่คณิตศาสตร์ + precision ล้วน ๆ (ไม่มี REST call)
+    """
+    try:
         if usdt_balance <= 0:
-            print("⚠️ No USDT balance available")
+            logger.warning("⚠️ No USDT balance available")
             return 0
 
-        # 2. คำนวณเงินที่ยอมเสี่ยง (Risk Amount)
+        # 1. คำนวณเงินที่ยอมเสี่ยง (Risk Amount)
         risk_amount = usdt_balance * RISK_PER_TRADE
 
-        # 3. คำนวณ Position Size (Fixed Fractional)
+        # 2. คำนวณ Position Size (Fixed Fractional)
         # Position Size = Risk Amount / Stop Loss Distance
-        stop_loss_distance = current_price * STOP_LOSS_PCT
         position_size_usdt = risk_amount / STOP_LOSS_PCT  # USDT value
 
-        # 4. แปลงเป็นจำนวนเหรียญ
+        # 3. แปลงเป็นจำนวนเหรียญ
         amount_coin = position_size_usdt / current_price
 
-        # 5. ปรับให้เข้า Binance Lot Size (Precision)
-        market_info = exchange.market(symbol)
-        amount_coin = exchange.amount_to_precision(symbol, amount_coin)
+        # 4. ปรับให้เข้า Binance Lot Size (ใช้ step ที่ cache ไว้ตอน start)
+        amount_coin = _round_amount(symbol, amount_coin)
 
-        # 6. ตรวจสอบ Min Amount
-        min_amount = market_info['limits']['amount']['min']
-        if float(amount_coin) < min_amount:
-            print(f"⚠️ Calculated amount {amount_coin} is below minimum {min_amount}")
+        # 5. ตรวจสอบ Min Amount
+        min_amount = MARKET_META[symbol]['min_amount']
+        if amount_coin < min_amount:
+            logger.warning(f"⚠️ Calculated amount {amount_coin} is below minimum {min_amount}")
             return 0
 
-        print(f"💰 Balance: {usdt_balance:.2f} USDT | Risk: {risk_amount:.2f} USDT | Size: {amount_coin} {symbol.split('/')[0]}")
-        return float(amount_coin)
+        logger.info(f"💰 Balance: {usdt_balance:.2f} USDT | Risk: {risk_amount:.2f} USDT | Size: {amount_coin} {symbol.split('/')[0]}")
+        return amount_coin
 
     except Exception as e:
-        print(f"❌ Error calculating position size: {e}")
+        logger.error(f"❌ Error calculating position size: {e}")
         return 0
 
 # ---------------------------------------------------------
 # 4. EXECUTION LOGIC (ส่วนส่งคำสั่ง)
 # ---------------------------------------------------------
-def execute_trade(signal, current_price, amount):
-    """ส่งคำสั่งซื้อขายจริง + ตั้ง Stop Loss"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+# Stop Loss order id ที่ active อยู่ต่อ symbol — เติมตอนตั้ง SL สำเร็จ
+# ใช้ตอนปิด Position จะได้ cancel ตรง id เลย ไม่ต้อง fetch_open_orders (REST)
+_stop_order_ids = {}
 
+async def _order_watcher(positions):
+    """ติดตาม order updates ผ่าน watchOrders (push) แทนการ poll
+
+    - Stop Loss โดน fill → รู้ทันทีว่า Position หลุดแล้ว (เดิมรู้ช้าสุด 1 แท่ง)
+      เคลียร์สถานะใน positions และ refresh balance
+    - Stop Loss ถูกยกเลิก → เคลียร์ id ที่ cache ไว้
+    """
+    while True:
+        try:
+            orders = await exchange.watch_orders()
+            for order in orders:
+                if str(order.get('type', '')).lower() not in ('stop_market', 'stop'):
+                    continue
+                symbol = order.get('symbol')
+                if _stop_order_ids.get(symbol) != order.get('id'):
+                    continue
+
+                status = order.get('status')
+                if status == 'closed':
+                    # SL fill = Position ถูกปิดโดย exchange แล้ว
+                    logger.warning(f"🛡️ Stop Loss FILLED for {symbol} — position closed by exchange")
+                    _stop_order_ids.pop(symbol, None)
+                    if symbol in positions:
+                        positions[symbol]['type'] = None
+                        positions[symbol]['amount'] = 0
+                    invalidate_balance_cache()
+                elif status in ('canceled', 'expired', 'rejected'):
+                    _stop_order_ids.pop(symbol, None)
+        except Exception as e:
+            logger.warning(f"⚠️ Order watcher error: {e}")
+            await asyncio.sleep(5)
+
+async def _cancel_open_stops(symbol):
+    """Fallback: ไม่รู้ id ของ Stop Loss — ไล่ cancel STOP_MARKET ที่ค้างทั้งหมด"""
+    open_orders = await exchange.fetch_open_orders(symbol)
+    for order in open_orders:
+        if order['type'] == 'STOP_MARKET':
+            await exchange.cancel_order(order['id'], symbol)
+            logger.info(f"🗑️ Cancelled Stop Loss: {order['id']}")
+
+async def execute_trade(symbol, signal, current_price, amount, pos_type=None):
+    """ส่งคำสั่งซื้อขายจริง + ตั้ง Stop Loss (ยิงพร้อมกันใน request เดียว)"""
     try:
         if signal == "BUY":
-            # Market Buy (LONG)
-            print(f"[{timestamp}] 🟢 LONG SIGNAL | Price: {current_price} | Amount: {amount}")
-            order = exchange.create_market_buy_order(SYMBOL, amount)
-            print(f"✅ Order executed: {order['id']}")
-
-            # ตั้ง Stop Loss (Optional but Recommended)
+            # Market Buy (LONG) + Stop Loss พร้อมกัน
+            logger.info(f"🟢 {symbol} LONG SIGNAL | Price: {current_price} | Amount: {amount}")
             stop_loss_price = current_price * (1 - STOP_LOSS_PCT)
-            stop_loss_price = exchange.price_to_precision(SYMBOL, stop_loss_price)
-
-            # IMPROVEMENT 2: Stop Loss with Safety Mechanism
-            try:
-                sl_order = exchange.create_order(
-                    symbol=SYMBOL,
-                    type='STOP_MARKET',
-                    side='sell',
-                    amount=amount,
-                    params={'stopPrice': stop_loss_price}
-                )
-                print(f"🛡️ Stop Loss set at {stop_loss_price}")
-            except Exception as sl_error:
-                print(f"⚠️ Failed to set Stop Loss: {sl_error}")
-                print(f"🚨 SAFETY MECHANISM: Closing position immediately!")
-                # Emergency close - sell the position immediately
-                try:
-                    emergency_close = exchange.create_market_sell_order(SYMBOL, amount)
-                    print(f"✅ Emergency close executed: {emergency_close['id']}")
-                    return None  # Return None to indicate position was closed
-                except Exception as close_error:
-                    print(f"❌ CRITICAL: Emergency close failed: {close_error}")
-                    print(f"⚠️ MANUAL INTERVENTION REQUIRED!")
-
-            return order
+            return await _open_with_stop(symbol, 'buy', amount, stop_loss_price)
 
         elif signal == "SELL":
-            # Market Sell (SHORT)
-            print(f"[{timestamp}] 🔴 SHORT SIGNAL | Price: {current_price} | Amount: {amount}")
-            order = exchange.create_market_sell_order(SYMBOL, amount)
-            print(f"✅ Order executed: {order['id']}")
-
-            # ตั้ง Stop Loss สำหรับ Short
+            # Market Sell (SHORT) + Stop Loss พร้อมกัน
+            logger.info(f"🔴 {symbol} SHORT SIGNAL | Price: {current_price} | Amount: {amount}")
             stop_loss_price = current_price * (1 + STOP_LOSS_PCT)
-            stop_loss_price = exchange.price_to_precision(SYMBOL, stop_loss_price)
-
-            # IMPROVEMENT 2: Stop Loss with Safety Mechanism
-            try:
-                sl_order = exchange.create_order(
-                    symbol=SYMBOL,
-                    type='STOP_MARKET',
-                    side='buy',
-                    amount=amount,
-                    params={'stopPrice': stop_loss_price}
-                )
-                print(f"🛡️ Stop Loss set at {stop_loss_price}")
-            except Exception as sl_error:
-                print(f"⚠️ Failed to set Stop Loss: {sl_error}")
-                print(f"🚨 SAFETY MECHANISM: Closing position immediately!")
-                # Emergency close - buy back the short position immediately
-                try:
-                    emergency_close = exchange.create_market_buy_order(SYMBOL, amount)
-                    print(f"✅ Emergency close executed: {emergency_close['id']}")
-                    return None  # Return None to indicate position was closed
-                except Exception as close_error:
-                    print(f"❌ CRITICAL: Emergency close failed: {close_error}")
-                    print(f"⚠️ MANUAL INTERVENTION REQUIRED!")
-
-            return order
+            return await _open_with_stop(symbol, 'sell', amount, stop_loss_price)
 
         elif signal == "CLOSE":
-            # ปิด Position (ต้องรู้ว่า Position ปัจจุบันเป็น LONG หรือ SHORT)
-            print(f"[{timestamp}] 🟡 CLOSING POSITION | Price: {current_price} | Amount: {amount}")
-
-            # ยกเลิก Stop Loss ที่ค้างอยู่ก่อน (ถ้ามี)
-            try:
-                open_orders = exchange.fetch_open_orders(SYMBOL)
-                for order in open_orders:
-                    if order['type'] == 'STOP_MARKET':
-                        exchange.cancel_order(order['id'], SYMBOL)
-                        print(f"🗑️ Cancelled Stop Loss: {order['id']}")
-            except Exception as cancel_error:
-                print(f"⚠️ Error cancelling stop loss: {cancel_error}")
-
-            # ปิด Position (ใช้ reduce_only=True เพื่อให้แน่ใจว่าเป็นการปิด)
-            # สำหรับ Binance Futures ต้องส่งคำสั่งตรงข้ามกับ Position
-            # ถ้าเป็น LONG ก็ SELL, ถ้าเป็น SHORT ก็ BUY
-            # (Logic นี้จะถูกจัดการใน run_bot)
-            return None
+            # ปิด Position: ยกเลิก Stop Loss + Market ฝั่งตรงข้ามพร้อมกัน
+            # (reduceOnly กันเคส Stop ทำงานก่อน — อย่างแย่ก็แค่ลดเป็นศูนย์ซ้ำ
+            # ไม่เปิด Position ใหม่สวนทาง) ยุบสอง RTT เหลือหนึ่ง และหดช่วง
+            # ที่ยังถือ Position แต่สัญญาณบอกให้ออกแล้ว
+            logger.info(f"🟡 {symbol} CLOSING POSITION | Price: {current_price} | Amount: {amount}")
+            close_side = 'buy' if pos_type == 'SHORT' else 'sell'
+
+            # ปกติรู้ id จาก watchOrders แล้ว cancel ตรง ๆ; fallback REST เมื่อไม่รู้
+            stop_id = _stop_order_ids.pop(symbol, None)
+            cancel_coro = (exchange.cancel_order(stop_id, symbol)
+                           if stop_id is not None else _cancel_open_stops(symbol))
+            cancel_result, close_order = await asyncio.gather(
+                cancel_coro,
+                exchange.create_order(symbol, 'market', close_side, amount,
+                                      params={'reduceOnly': True}),
+                return_exceptions=True
+            )
+
+            if isinstance(cancel_result, Exception):
+                logger.warning(f"⚠️ Error cancelling stop loss: {cancel_result}")
+            elif stop_id is not None:
+                logger.info(f"🗑️ Cancelled Stop Loss: {stop_id}")
+
+            if isinstance(close_order, Exception):
+                logger.error(f"❌ Error closing {pos_type}: {close_order}")
+                return None
+
+            logger.info(f"✅ {pos_type} Closed: {close_order['id']}")
+            invalidate_balance_cache()
+            return close_order
 
     except Exception as e:
-        print(f"❌ Execution Error: {e}")
+        logger.error(f"❌ Execution Error: {e}")
+        return None
+
+async def _open_with_stop(symbol, side, amount, stop_loss_price):
+    """เปิด Market Order + STOP_MARKET ใน HTTP request เดียว (batchOrders)
+
+    Binance Futures รับได้ถึง 5 orders ต่อ POST /fapi/v1/batchOrders —
+    ยุบสอง RTT เหลือหนึ่ง และหดช่วงที่ Position ไม่มี Stop Loss คุ้มกัน
+    ถ้า batch call ใช้ไม่ได้ fallback ไปยิงขนานด้วย gather ตามเดิม
+    """
+    close_side = 'sell' if side == 'buy' else 'buy'
+    stop_loss_price = _ROUND_PRICE[symbol](stop_loss_price)
+
+    raw_symbol = MARKET_META[symbol]['market']['id']  # เช่น 'BNBUSDT'
+    batch = [
+        {
+            'symbol': raw_symbol,
+            'side': side.upper(),
+            'type': 'MARKET',
+            'quantity': str(amount),
+        },
+        {
+            'symbol': raw_symbol,
+            'side': close_side.upper(),
+            'type': 'STOP_MARKET',
+            'quantity': str(amount),
+            'stopPrice': str(stop_loss_price),
+        },
+    ]
+
+    try:
+        response = await exchange.fapiPrivatePostBatchOrders(
+            {'batchOrders': json.dumps(batch)}
+        )
+        # Response เป็น list ตามลำดับ order; ตัวที่ fail จะเป็น {'code':..,'msg':..}
+        order_result = response[0]
+        sl_result = response[1]
+        order_ok = 'orderId' in order_result
+        sl_ok = 'orderId' in sl_result
+        return await _settle_open(symbol, order_result, sl_result, order_ok, sl_ok,
+                                  close_side, amount, stop_loss_price,
+                                  order_id_key='orderId')
+    except Exception as batch_error:
+        logger.warning(f"⚠️ batchOrders failed ({batch_error}) — falling back to parallel orders")
+        return await _open_with_stop_gather(symbol, side, close_side, amount, stop_loss_price)
+
+async def _open_with_stop_gather(symbol, side, close_side, amount, stop_loss_price):
+    """Fallback: ยิง Market + STOP_MARKET ขนานกันด้วย asyncio.gather"""
+    order_result, sl_result = await asyncio.gather(
+        exchange.create_order(symbol, 'market', side, amount),
+        exchange.create_order(
+            symbol, 'STOP_MARKET', close_side, amount,
+            params={'stopPrice': stop_loss_price}
+        ),
+        return_exceptions=True
+    )
+
+    order_ok = not isinstance(order_result, Exception)
+    sl_ok = not isinstance(sl_result, Exception)
+    return await _settle_open(symbol, order_result, sl_result, order_ok, sl_ok,
+                              close_side, amount, stop_loss_price,
+                              order_id_key='id')
+
+async def _settle_open(symbol, order_result, sl_result, order_ok, sl_ok,
+                       close_side, amount, stop_loss_price, order_id_key):
+    """จัดการผลลัพธ์ของคู่ Market + Stop Loss (ใช้ร่วมทั้ง batch และ gather path)"""
+    if order_ok:
+        invalidate_balance_cache()  # มี fill เกิดขึ้นแล้ว — ค่า cache ใช้ไม่ได้
+
+    if order_ok and sl_ok:
+        _stop_order_ids[symbol] = sl_result[order_id_key]  # ให้ close path cancel ตรง id
+        logger.info(f"✅ Order executed: {order_result[order_id_key]}")
+        logger.info(f"🛡️ Stop Loss set at {stop_loss_price}")
+        return order_result
+
+    if order_ok and not sl_ok:
+        # IMPROVEMENT 2: Stop Loss with Safety Mechanism
+        logger.warning(f"⚠️ Failed to set Stop Loss: {sl_result}")
+        logger.error(f"🚨 SAFETY MECHANISM: Closing position immediately!")
+        try:
+            emergency_close = await exchange.create_order(symbol, 'market', close_side, amount)
+            logger.info(f"✅ Emergency close executed: {emergency_close['id']}")
+        except Exception as close_error:
+            logger.error(f"❌ CRITICAL: Emergency close failed: {close_error}")
+            logger.warning(f"⚠️ MANUAL INTERVENTION REQUIRED!")
         return None
 
+    if not order_ok and sl_ok:
+        # Market order ไม่เข้าแต่ Stop Loss ค้างอยู่ — ต้องยกเลิกทิ้ง
+        logger.error(f"❌ Market order failed: {order_result}")
+        try:
+            await exchange.cancel_order(sl_result[order_id_key], symbol)
+            logger.info(f"🗑️ Cancelled orphaned Stop Loss: {sl_result[order_id_key]}")
+        except Exception as cancel_error:
+            logger.warning(f"⚠️ Error cancelling orphaned stop loss: {cancel_error}")
+        return None
+
+    logger.error(f"❌ Execution Error: {order_result}")
+    return None
+
 # ---------------------------------------------------------
 # 5. MAIN BOT LOOP (ลูปทำงานหลัก)
 # ---------------------------------------------------------
-def run_bot():
-    print(f"--- Starting Z-Score Bot for {SYMBOL} ---")
-    print(f"⚙️ Config: Risk={RISK_PER_TRADE*100}% | SL={STOP_LOSS_PCT*100}% | Entry Z={ENTRY_THRESHOLD} | Exit Z={EXIT_THRESHOLD}")
-
-    # สถานะ Bot
-    in_position = False
-    position_type = None  # 'LONG' or 'SHORT'
-    position_amount = 0   # จำนวนเหรียญที่ถือจริง (สำหรับปิด Position)
+async def _evaluate_symbol(symbol, current_price, last_z, mean, std, usdt_balance, pos):
+    """ตัดสินใจเข้า/ออกของ symbol เดียวจากสถิติที่คำนวณแล้ว (mutate pos)"""
+    # สถานะราย tick อยู่ระดับ DEBUG — gate ก่อนเพื่อไม่เสียค่า format f-string
+    # ใน production (ระดับ INFO จะเหลือเฉพาะ event เทรดจริง)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"📊 {symbol} | Price: {current_price} | Z-Score: {last_z:.2f} | Position: {pos['type'] if pos['type'] else 'None'}")
+
+    # ตัดสินใจใน kernel native แล้วค่อย switch บน action เดียว
+    action = decide(current_price, mean, std, ENTRY_THRESHOLD, EXIT_THRESHOLD,
+                    _POS_INT[pos['type']])
+
+    if action == HOLD:
+        return
+
+    if action == OPEN_SHORT:
+        # ราคาแพงเกินไป — คำนวณ Position Size ก่อน
+        amount = calculate_position_size(symbol, current_price, usdt_balance)
+        if amount > 0:
+            order = await execute_trade(symbol, "SELL", current_price, amount)
+            if order:
+                pos['type'] = 'SHORT'
+                pos['amount'] = amount  # เก็บจำนวนจริงที่ Execute
+
+    elif action == OPEN_LONG:
+        # ราคาถูกเกินไป — คำนวณ Position Size ก่อน
+        amount = calculate_position_size(symbol, current_price, usdt_balance)
+        if amount > 0:
+            order = await execute_trade(symbol, "BUY", current_price, amount)
+            if order:
+                pos['type'] = 'LONG'
+                pos['amount'] = amount  # เก็บจำนวนจริงที่ Execute
+
+    elif action == CLOSE_SHORT:
+        # ราคากลับมาที่ Mean
+        close_order = await execute_trade(symbol, "CLOSE", current_price,
+                                          pos['amount'], pos_type='SHORT')
+        if close_order:
+            pos['type'] = None
+            pos['amount'] = 0
+
+    elif action == CLOSE_LONG:
+        # ราคากลับมาที่ Mean
+        close_order = await execute_trade(symbol, "CLOSE", current_price,
+                                          pos['amount'], pos_type='LONG')
+        if close_order:
+            pos['type'] = None
+            pos['amount'] = 0
+
+async def run_bot():
+    logger.info(f"--- Starting Z-Score Bot for {', '.join(SYMBOLS)} ---")
+    logger.info(f"⚙️ Config: Risk={RISK_PER_TRADE*100}% | SL={STOP_LOSS_PCT*100}% | Entry Z={ENTRY_THRESHOLD} | Exit Z={EXIT_THRESHOLD}")
+
+    # สถานะ Bot ต่อ symbol
+    positions = {s: {'type': None, 'amount': 0} for s in SYMBOLS}
+
+    # เปิด watchOrders ค้างไว้ตั้งแต่ต้น — เห็น fill/cancel แบบ push ไม่ต้อง poll
+    order_watcher_task = None
+    if USE_WEBSOCKET:
+        order_watcher_task = asyncio.create_task(_order_watcher(positions))
+
+    # Websocket ใช้กับ symbol เดียว — หลาย symbol ใช้ REST gather ขนานกัน
+    stream_mode = USE_WEBSOCKET and len(SYMBOLS) == 1
+
+    # ประวัติราคาปิดของแท่งที่ปิดแล้ว (websocket mode เติมทีละแท่งจาก push)
+    closes_hist = []
+    last_bar_ts = 0
+
+    # REST mode: ring buffer ราคาปิดต่อ symbol + timestamp แท่งปิดล่าสุด
+    rest_buffers = {}
+    rest_last_ts = {}
+
+    # นับ error ติดกันไว้คำนวณ backoff แบบทวีคูณ (มี cap)
+    consecutive_errors = 0
 
     while True:
         try:
-            # 1. ดึงข้อมูล
-            df = fetch_data(SYMBOL, TIMEFRAME, LIMIT)
-            if df is None:
-                time.sleep(10)
-                continue
-
-            # 2. คำนวณ Z-Score
-            df = calculate_z_score(df, Z_SCORE_WINDOW)
-            last_z = df['z_score'].iloc[-1]
-            current_price = df['close'].iloc[-1]
-
-            print(f"\n📊 Price: {current_price} | Z-Score: {last_z:.2f} | Position: {position_type if in_position else 'None'}")
-
-            # 3. ตัดสินใจ (Decision Logic)
-            if not in_position:
-                # เงื่อนไขเปิด Short (ราคาแพงเกินไป)
-                if last_z > ENTRY_THRESHOLD:
-                    # คำนวณ Position Size ก่อน
-                    amount = calculate_position_size(SYMBOL, current_price)
-                    if amount > 0:
-                        order = execute_trade("SELL", current_price, amount)
-                        if order:
-                            in_position = True
-                            position_type = 'SHORT'
-                            position_amount = amount  # เก็บจำนวนจริงที่ Execute
-
-                # เงื่อนไขเปิด Long (ราคาถูกเกินไป)
-                elif last_z < -ENTRY_THRESHOLD:
-                    # คำนวณ Position Size ก่อน
-                    amount = calculate_position_size(SYMBOL, current_price)
-                    if amount > 0:
-                        order = execute_trade("BUY", current_price, amount)
-                        if order:
-                            in_position = True
-                            position_type = 'LONG'
-                            position_amount = amount  # เก็บจำนวนจริงที่ Execute
-
-            else:  # ถ้ามี Position อยู่แล้ว
-                # เงื่อนไขปิด Short (ราคากลับมาที่ Mean)
-                if position_type == 'SHORT' and last_z < EXIT_THRESHOLD:
-                    execute_trade("CLOSE", current_price, position_amount)
-                    # ปิด Short = Buy กลับ
-                    try:
-                        close_order = exchange.create_market_buy_order(SYMBOL, position_amount)
-                        print(f"✅ SHORT Closed: {close_order['id']}")
-                        in_position = False
-                        position_type = None
-                        position_amount = 0
-                    except Exception as close_error:
-                        print(f"❌ Error closing SHORT: {close_error}")
-
-                # เงื่อนไขปิด Long (ราคากลับมาที่ Mean)
-                elif position_type == 'LONG' and last_z > -EXIT_THRESHOLD:
-                    execute_trade("CLOSE", current_price, position_amount)
-                    # ปิด Long = Sell
-                    try:
-                        close_order = exchange.create_market_sell_order(SYMBOL, position_amount)
-                        print(f"✅ LONG Closed: {close_order['id']}")
-                        in_position = False
-                        position_type = None
-                        position_amount = 0
-                    except Exception as close_error:
-                        print(f"❌ Error closing LONG: {close_error}")
-
-            # รอจนกว่าจะจบแท่งเทียนถัดไป (หรือเช็คทุก 1 นาที)
-            time.sleep(60)
-
-        except KeyboardInterrupt:
-            print("\n🛑 Bot stopped by user.")
-            sys.exit()
+            if stream_mode:
+                # Warmup ครั้งเดียว: ดึงแค่ window+1 แท่งพอ (ไม่ใช่ LIMIT=100)
+                if not closes_hist:
+                    warm_closes, warm_ts = await fetch_data(
+                        SYMBOL, TIMEFRAME, Z_SCORE_WINDOW + 2)
+                    if warm_closes is None:
+                        await asyncio.sleep(10)
+                        continue
+                    closes_hist = list(warm_closes[:-1])  # ตัดแท่งที่ยังไม่ปิด
+                    last_bar_ts = warm_ts
+
+                # Block จนกว่า exchange จะ push update (sub-second แทนรอ 60s + RTT)
+                ohlcv = await exchange.watch_ohlcv(SYMBOL, TIMEFRAME)
+                new_ts = ohlcv[-1][0]
+                if new_ts == last_bar_ts:
+                    continue  # แท่งปัจจุบันยังไม่ปิด — ยังไม่ตัดสินใจ
+
+                # แท่งเก่าปิดแล้ว — เก็บ close ของทุกแท่งที่เพิ่งปิด
+                # แท่งต้องต่อกันพอดีเหมือนกติกาฝั่ง REST: หลัง websocket หลุด
+                # Binance ไม่ replay แท่งที่พลาด cache จึงมีรู — ถ้าเจอให้ล้าง
+                # buffer แล้ว warmup ใหม่ ไม่เอา window ที่ผสมแท่งไม่ติดกัน
+                tf_ms = TF_SEC * 1000
+                expected_ts = last_bar_ts
+                for bar in ohlcv:
+                    if last_bar_ts <= bar[0] < new_ts:
+                        if bar[0] != expected_ts:
+                            break  # แท่งข้าม — ทิ้งทั้งรอบ
+                        closes_hist.append(bar[4])
+                        expected_ts = bar[0] + tf_ms
+                if expected_ts != new_ts:
+                    closes_hist.clear()  # มีรูใน buffer — warmup ใหม่รอบหน้า
+                    continue
+                # เก็บแค่ window+1 ค่า — Z-Score ไม่เคยมองย้อนไกลกว่านั้น
+                del closes_hist[:-(Z_SCORE_WINDOW + 1)]
+                last_bar_ts = new_ts
+
+                consecutive_errors = 0  # ได้ข้อมูลแล้ว — streak จบ
+                closes = np.asarray(closes_hist, dtype=np.float64)
+                usdt_balance = await fetch_usdt_balance()
+
+                last_z, mean, std = last_zscore(closes, Z_SCORE_WINDOW)
+                await _evaluate_symbol(SYMBOL, closes[-1], last_z, mean, std,
+                                       usdt_balance, positions[SYMBOL])
+            else:
+                # REST: ring buffer ต่อ symbol — หลัง warmup ดึงแค่ limit=2
+                # (แท่งที่เพิ่งปิด + แท่งเปิด) แทนการโหลด LIMIT=100 ซ้ำทุกรอบ
+                warming = not rest_buffers
+                fetch_limit = Z_SCORE_WINDOW + 2 if warming else 2
+                results = await asyncio.gather(
+                    *[fetch_bars(s, TIMEFRAME, fetch_limit) for s in SYMBOLS],
+                    fetch_usdt_balance()
+                )
+                usdt_balance = results[-1]
+                if any(r is None for r in results[:-1]):
+                    rest_buffers.clear()  # ข้อมูลขาด — warmup ใหม่รอบหน้า
+                    await asyncio.sleep(10)
+                    continue
+
+                consecutive_errors = 0  # ได้ข้อมูลแล้ว — streak จบ
+                tf_ms = TF_SEC * 1000
+                bar_advanced = False
+                gap = False
+                for symbol, bars in zip(SYMBOLS, results[:-1]):
+                    if warming:
+                        rest_buffers[symbol] = deque(maxlen=Z_SCORE_WINDOW + 1)
+                        rest_last_ts[symbol] = 0
+                    # เติมเฉพาะแท่งที่ปิดแล้ว (ตัวสุดท้ายคือแท่งเปิด) และใหม่จริง
+                    for bar in bars[:-1]:
+                        if bar[0] > rest_last_ts[symbol]:
+                            # แท่งใหม่ต้องต่อจากแท่งเดิมพอดี — ถ้าข้าม
+                            # (พลาดรอบจาก backoff/หลุด network) ห้ามเติมต่อ
+                            # ไม่งั้น window ผสมแท่งไม่ติดกันไปอีกทั้ง window
+                            if (not warming and rest_last_ts[symbol]
+                                    and bar[0] != rest_last_ts[symbol] + tf_ms):
+                                gap = True
+                            rest_buffers[symbol].append(bar[4])
+                            rest_last_ts[symbol] = bar[0]
+                            bar_advanced = True
+
+                if gap:
+                    rest_buffers.clear()  # มีรูใน buffer — warmup ใหม่ทันที
+                    continue
+
+                # แท่งล่าสุดยังเป็นแท่งเดิม (NTP drift / exchange ส่งช้า) —
+                # ไม่คำนวณซ้ำ ไม่เสี่ยงเทรดซ้ำบนสัญญาณเดิม รอแล้วดึงใหม่
+                if not bar_advanced and not warming:
+                    await asyncio.sleep(1)
+                    continue
+
+                # ยังมีข้อมูลไม่ครบ window — รอแท่งถัดไปก่อนค่อยคำนวณ
+                if any(len(rest_buffers[s]) < Z_SCORE_WINDOW + 1
+                       for s in SYMBOLS):
+                    now = time.time()
+                    next_close = (now // TF_SEC + 1) * TF_SEC
+                    await asyncio.sleep(max(0.0, next_close + 0.2 - now))
+                    continue
+
+                # SoA buffer: แถวละ symbol — คำนวณทุกเหรียญใน kernel เดียว
+                closes2d = np.stack([
+                    np.fromiter(rest_buffers[s], dtype=np.float64,
+                                count=len(rest_buffers[s]))
+                    for s in SYMBOLS
+                ])
+                zs, means, stds = batch_signals(closes2d, Z_SCORE_WINDOW)
+
+                for i, symbol in enumerate(SYMBOLS):
+                    await _evaluate_symbol(symbol, closes2d[i, -1], zs[i],
+                                           means[i], stds[i], usdt_balance,
+                                           positions[symbol])
+
+                # หลับยาวถึง 200ms หลังแท่งถัดไปปิดพอดี — แทนการตื่นทุก 60s
+                # มาเจอแท่งเดิม (บน 15m คือลด fetch ทิ้งเปล่า ~14 รอบต่อแท่ง)
+                now = time.time()
+                next_close = (now // TF_SEC + 1) * TF_SEC
+                await asyncio.sleep(max(0.0, next_close + 0.2 - now))
+
+        except ccxtpro.RateLimitExceeded as e:
+            # โดน rate limit ต้องถอยอย่างน้อยเท่าที่ exchange ขอ และถอยเพิ่ม
+            # ตาม streak — ยิงซ้ำถี่ ๆ เสี่ยงโดนแบน API
+            consecutive_errors += 1
+            delay = max(exchange.rateLimit / 1000,
+                        min(60, 2 ** consecutive_errors))
+            logger.warning(f"⚠️ Rate limit exceeded: {e} — backing off {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+        except ccxtpro.NetworkError as e:
+            # Network สะดุดชั่วคราว: retry แรกเร็ว แล้วค่อยถอยแบบทวีคูณ (cap 60s)
+            consecutive_errors += 1
+            delay = min(60, 2 ** consecutive_errors)
+            logger.warning(f"⚠️ Network error: {e} — retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
         except Exception as e:
-            print(f"❌ Unexpected Error: {e}")
-            time.sleep(10)
+            consecutive_errors += 1
+            delay = min(60, 10 * 2 ** (consecutive_errors - 1))
+            logger.error(f"❌ Unexpected Error: {e}")
+            await asyncio.sleep(delay)
+
+async def main():
+    global exchange
+    exchange = await initialize_exchange()
+    cache_market_metadata()
+    try:
+        await run_bot()
+    finally:
+        await exchange.close()
 
 if __name__ == "__main__":
-    run_bot()
\ No newline at end of file
+    log_listener = setup_logging()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("🛑 Bot stopped by user.")
+        sys.exit()
+    finally:
+        log_listener.stop()
@@ -1,26 +1,94 @@
-import ccxt
-import pandas as pd
+import ccxt.async_support as ccxt
+import ccxt.pro as ccxtpro
 import numpy as np
 import time
+import math
+import random
+import asyncio
+import atexit
+import threading
 from datetime import datetime
 import sys
 import os
 from dotenv import load_dotenv
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from typing import Optional, Dict, Tuple
-import json
-import requests  # For LINE Messaging API
+from functools import partial
+from numba import njit
+import aiohttp  # Tuned connection pool for ccxt's REST transport
+import httpx  # For LINE Messaging API (pooled async client)
+
+# orjson parses/serializes 2-5x faster than stdlib json with fewer
+# allocations; optional — fall back to stdlib when it isn't installed.
+# ccxt decodes every REST response (OHLCV, balance, orders) through
+# json.loads, so rebinding the json name its base module sees covers all
+# of them. Only the name inside ccxt is touched — mutating the stdlib
+# module would break json.load kwargs, NaN parsing, and dumps options
+# for every other library in the process.
+try:
+    import orjson
+    import json as _stdlib_json
+    import types as _types
+    import ccxt.base.exchange as _ccxt_base
+    _ccxt_base.json = _types.SimpleNamespace(
+        loads=orjson.loads,
+        dumps=lambda obj, **kw: orjson.dumps(obj).decode(),
+        JSONDecodeError=_stdlib_json.JSONDecodeError,
+    )
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    import json
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
 
 # ---------------------------------------------------------
 # 1. LOGGING SETUP (Production-Ready Logging)
 # ---------------------------------------------------------
-def setup_logging():
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler with a 64KB stream buffer and no per-record flush.
+
+    Many small synchronous write()+flush() pairs per cycle are amortized
+    into a few large writes; the buffer is forced to disk immediately on
+    ERROR and above, and on a 30s background timer, so nothing important
+    is lost on a crash.
+    """
+
+    def _open(self):
+        return open(self.baseFilename, self.mode,
+                    buffering=64 * 1024, encoding=self.encoding)
+
+    def flush(self):
+        # Skip the per-record flush StreamHandler.emit would do;
+        # force_flush() handles ERROR+ records and the periodic timer
+        pass
+
+    def force_flush(self):
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.flush()
+        finally:
+            self.release()
+
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            self.force_flush()
+
+def setup_logging() -> logging.Logger:
     """
     Configure production-grade logging with:
     - File rotation (max 10MB per file, keep 5 backups)
     - Both file and console output
     - Structured format with timestamps
+    - Queue-based emit: logger calls just enqueue a record (sub-us) and a
+      background listener thread does the actual formatting and disk I/O
     """
     # Create logs directory if it doesn't exist
     log_dir = os.path.join(os.path.dirname(__file__), 'logs')
@@ -30,9 +98,9 @@ def setup_logging():
     logger = logging.getLogger('MeanReversionBot')
     logger.setLevel(logging.INFO)
 
-    # File handler with rotation (10MB max, keep 5 backups)
+    # Buffered file handler with rotation (10MB max, keep 5 backups)
     log_file = os.path.join(log_dir, 'bot_mean_reversion.log')
-    file_handler = RotatingFileHandler(
+    file_handler = BufferedRotatingFileHandler(
         log_file,
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5,
@@ -52,9 +120,23 @@ def setup_logging():
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
 
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # The trading loop only talks to the queue; the listener thread owns
+    # the file/console handlers and drains records off the hot path
+    log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, file_handler, console_handler,
+                             respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    # Flush the buffered file stream every 30s in the background
+    def _periodic_flush():
+        file_handler.force_flush()
+        timer = threading.Timer(30, _periodic_flush)
+        timer.daemon = True
+        timer.start()
+    _periodic_flush()
 
     return logger
 
@@ -79,12 +161,19 @@ LIMIT = int(os.getenv('LIMIT', '100'))
 Z_SCORE_WINDOW = int(os.getenv('Z_SCORE_WINDOW', '20'))
 ENTRY_THRESHOLD = float(os.getenv('ENTRY_THRESHOLD', '2.0'))
 EXIT_THRESHOLD = float(os.getenv('EXIT_THRESHOLD', '0.5'))
+# Negated once here so neither the loop nor the decision kernel pays a
+# unary negation per tick
+NEG_ENTRY_THRESHOLD = -ENTRY_THRESHOLD
+NEG_EXIT_THRESHOLD = -EXIT_THRESHOLD
 
 # Risk Management
 RISK_PER_TRADE = float(os.getenv('RISK_PER_TRADE', '0.01'))
 STOP_LOSS_PCT = float(os.getenv('STOP_LOSS_PCT', '0.02'))
 MAX_LEVERAGE = int(os.getenv('MAX_LEVERAGE', '10'))
 
+# Data Feed (websocket kline push; falls back to REST polling when disabled)
+USE_WEBSOCKET = os.getenv('USE_WEBSOCKET', '1') == '1'
+
 # Retry Configuration
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
 RETRY_DELAY = int(os.getenv('RETRY_DELAY', '2'))  # seconds
@@ -98,70 +187,199 @@ LINE_ENABLED = bool(LINE_CHANNEL_ACCESS_TOKEN and LINE_USER_ID)  # Auto-disable
 # ---------------------------------------------------------
 # LINE NOTIFICATION CLASS
 # ---------------------------------------------------------
+# Message templates are built once at module load; notify_* methods only
+# run str.format over them instead of re-concatenating the constant
+# header/emoji blocks on every send
+_COIN = SYMBOL.split('/')[0]
+
+_OPEN_TEMPLATE = """🤖 Mean Reversion Trading Bot
+
+{emoji} เปิดออเดอร์ {position_type}
+
+📊 ข้อมูลการเทรด:
+• ราคาเข้า: {entry_price:.2f} USDT
+• ราคา Stop Loss: {stop_loss:.2f} USDT
+• จำนวนที่เปิด: {amount:.4f} {coin}
+• มูลค่า: {value_usdt:.2f} USDT
+
+💰 ยอดเงินคงเหลือ: {balance:.2f} USDT
+
+⏰ เวลา: {timestamp}"""
+
+_CLOSE_TEMPLATE = """🤖 Mean Reversion Trading Bot
+
+🟡 ปิดออเดอร์ {position_type}
+
+📊 ข้อมูลการเทรด:
+• ราคาออก: {exit_price:.2f} USDT
+• จำนวนที่ปิด: {amount:.4f} {coin}
+
+{pnl_emoji} กำไร/ขาดทุน: {emoji} {pnl:+.2f} USDT
+
+💰 ยอดเงินคงเหลือ: {balance:.2f} USDT
+
+⏰ เวลา: {timestamp}"""
+
+_INSUFFICIENT_TEMPLATE = """🤖 Mean Reversion Trading Bot
+
+⚠️ ยอดเงินไม่เพียงพอ
+
+💰 ข้อมูล:
+• ยอดที่ต้องการ: {required:.2f} USDT
+• ยอดที่มี: {available:.2f} USDT
+• ขาด: {shortfall:.2f} USDT
+
+⏰ เวลา: {timestamp}"""
+
+_ERROR_TEMPLATE = """🤖 Mean Reversion Trading Bot
+
+🚨 ข้อผิดพลาดระบบ
+
+❌ ประเภท: {error_type}
+📝 รายละเอียด: {error_message}
+
+⏰ เวลา: {timestamp}"""
+
 class LineNotifier:
     """
     LINE Messaging API notification handler.
     Sends trading notifications to LINE with error handling.
+
+    Uses a pooled httpx.AsyncClient on a dedicated background event loop:
+    the TLS connection is kept alive between pushes (no ~150ms handshake
+    per notification) and send_message() just schedules the POST, so a
+    slow LINE API never blocks the trading loop.
     """
 
     def __init__(self, access_token: str, user_id: str, enabled: bool = True):
         self.access_token = access_token
         self.user_id = user_id
         self.enabled = enabled
-        self.api_url = "https://api.line.me/v2/bot/message/push"
 
         if self.enabled:
+            self._client = httpx.AsyncClient(
+                base_url="https://api.line.me",
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {self.access_token}"
+                },
+                limits=httpx.Limits(max_connections=10,
+                                    max_keepalive_connections=4,
+                                    keepalive_expiry=75),
+                # LINE supports HTTP/2: bursts of pushes multiplex over one
+                # TLS session instead of queueing per HTTP/1.1 socket
+                http2=True,
+                timeout=10.0
+            )
+            # Notifications run on their own loop/thread so callers stay sync
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever,
+                             name='line-notifier', daemon=True).start()
+            # Bounded queue + single drainer: sends stay ordered and a LINE
+            # outage can't pile up unbounded pending coroutines
+            self._queue = None
+            asyncio.run_coroutine_threadsafe(
+                self._start_drainer(), self._loop).result(timeout=5)
+            atexit.register(self.close)
             logger.info("✓ LINE Notifications: ENABLED")
         else:
             logger.warning("⚠ LINE Notifications: DISABLED (missing credentials)")
 
+    async def _start_drainer(self):
+        """Create the queue and drainer task on the notifier's event loop."""
+        self._queue = asyncio.Queue(maxsize=100)
+        asyncio.ensure_future(self._drain())
+
+    async def _drain(self):
+        """Deliver queued notifications one at a time, in order."""
+        while True:
+            message = await self._queue.get()
+            await self._post(message)
+            self._queue.task_done()
+
+    def _enqueue(self, message: str):
+        """Put a message on the queue (runs on the notifier's event loop)."""
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("⚠ LINE notification queue full - dropping message")
+
+    # Transient LINE API statuses worth retrying (rate limit / 5xx)
+    _RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    _RETRY_TOTAL = 3
+    _RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+
+    async def _post(self, message: str) -> bool:
+        """POST one push message with bounded retries on transient failures
+        (runs on the notifier's event loop)."""
+        payload = {
+            "to": self.user_id,
+            "messages": [
+                {
+                    "type": "text",
+                    "text": message
+                }
+            ]
+        }
+        # Serialize with orjson and pass bytes directly; the client's
+        # Content-Type header already says application/json
+        body = _json_dumps(payload)
+
+        for attempt in range(self._RETRY_TOTAL):
+            try:
+                response = await self._client.post("/v2/bot/message/push",
+                                                   content=body)
+            except Exception as e:
+                logger.warning(f"⚠ LINE notification attempt {attempt + 1}/{self._RETRY_TOTAL} failed: {e}")
+                response = None
+
+            if response is not None:
+                if response.status_code == 200:
+                    logger.debug("✓ LINE notification sent successfully")
+                    return True
+                if response.status_code not in self._RETRY_STATUSES:
+                    logger.warning(f"⚠ LINE API returned status {response.status_code}: {response.text}")
+                    return False
+                logger.warning(f"⚠ LINE API returned status {response.status_code} - retrying")
+
+            if attempt < self._RETRY_TOTAL - 1:
+                await asyncio.sleep(self._RETRY_BACKOFF * (2 ** attempt))
+
+        logger.error(f"❌ LINE notification failed after {self._RETRY_TOTAL} attempts")
+        return False
+
     def send_message(self, message: str) -> bool:
         """
-        Send a text message to LINE.
+        Send a text message to LINE (fire-and-forget).
 
         Args:
             message: The message text to send
 
         Returns:
-            bool: True if sent successfully, False otherwise
+            bool: True if the send was scheduled, False if disabled
         """
         if not self.enabled:
             logger.debug("LINE notification skipped (disabled)")
             return False
 
-        try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.access_token}"
-            }
-
-            payload = {
-                "to": self.user_id,
-                "messages": [
-                    {
-                        "type": "text",
-                        "text": message
-                    }
-                ]
-            }
-
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                data=json.dumps(payload),
-                timeout=10
-            )
-
-            if response.status_code == 200:
-                logger.debug("✓ LINE notification sent successfully")
-                return True
-            else:
-                logger.warning(f"⚠ LINE API returned status {response.status_code}: {response.text}")
-                return False
+        self._loop.call_soon_threadsafe(self._enqueue, message)
+        return True
 
-        except Exception as e:
-            logger.error(f"❌ LINE notification error: {e}")
-            return False
+    def close(self):
+        """Drain pending sends, close the HTTP client, stop the loop."""
+        if not self.enabled:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self._queue.join(), self._loop).result(timeout=10)
+        except Exception:
+            pass
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self._client.aclose(), self._loop).result(timeout=5)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
 
     def notify_order_open(self, position_type: str, entry_price: float,
                          stop_loss: float, amount: float, value_usdt: float,
@@ -177,22 +395,17 @@ class LineNotifier:
             value_usdt: Position value in USDT
             balance: Remaining wallet balance
         """
-        emoji = "🟢" if position_type == "LONG" else "🔴"
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        message = f"""🤖 Mean Reversion Trading Bot
-
-{emoji} เปิดออเดอร์ {position_type}
-
-📊 ข้อมูลการเทรด:
-• ราคาเข้า: {entry_price:.2f} USDT
-• ราคา Stop Loss: {stop_loss:.2f} USDT
-• จำนวนที่เปิด: {amount:.4f} {SYMBOL.split('/')[0]}
-• มูลค่า: {value_usdt:.2f} USDT
-
-💰 ยอดเงินคงเหลือ: {balance:.2f} USDT
-
-⏰ เวลา: {timestamp}"""
+        message = _OPEN_TEMPLATE.format(
+            emoji="🟢" if position_type == "LONG" else "🔴",
+            position_type=position_type,
+            entry_price=entry_price,
+            stop_loss=stop_loss,
+            amount=amount,
+            coin=_COIN,
+            value_usdt=value_usdt,
+            balance=balance,
+            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
 
         return self.send_message(message)
 
@@ -208,23 +421,17 @@ class LineNotifier:
             pnl: Profit/Loss in USDT
             balance: Remaining wallet balance
         """
-        emoji = "🟢" if pnl >= 0 else "🔴"
-        pnl_emoji = "📈" if pnl >= 0 else "📉"
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        message = f"""🤖 Mean Reversion Trading Bot
-
-🟡 ปิดออเดอร์ {position_type}
-
-📊 ข้อมูลการเทรด:
-• ราคาออก: {exit_price:.2f} USDT
-• จำนวนที่ปิด: {amount:.4f} {SYMBOL.split('/')[0]}
-
-{pnl_emoji} กำไร/ขาดทุน: {emoji} {pnl:+.2f} USDT
-
-💰 ยอดเงินคงเหลือ: {balance:.2f} USDT
-
-⏰ เวลา: {timestamp}"""
+        message = _CLOSE_TEMPLATE.format(
+            position_type=position_type,
+            exit_price=exit_price,
+            amount=amount,
+            coin=_COIN,
+            pnl_emoji="📈" if pnl >= 0 else "📉",
+            emoji="🟢" if pnl >= 0 else "🔴",
+            pnl=pnl,
+            balance=balance,
+            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
 
         return self.send_message(message)
 
@@ -236,18 +443,12 @@ class LineNotifier:
             required: Required amount in USDT
             available: Available balance in USDT
         """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        message = f"""🤖 Mean Reversion Trading Bot
-
-⚠️ ยอดเงินไม่เพียงพอ
-
-💰 ข้อมูล:
-• ยอดที่ต้องการ: {required:.2f} USDT
-• ยอดที่มี: {available:.2f} USDT
-• ขาด: {required - available:.2f} USDT
-
-⏰ เวลา: {timestamp}"""
+        message = _INSUFFICIENT_TEMPLATE.format(
+            required=required,
+            available=available,
+            shortfall=required - available,
+            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
 
         return self.send_message(message)
 
@@ -259,16 +460,11 @@ class LineNotifier:
             error_type: Type of error (e.g., 'API Connection', 'Order Execution')
             error_message: Error message details
         """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        message = f"""🤖 Mean Reversion Trading Bot
-
-🚨 ข้อผิดพลาดระบบ
-
-❌ ประเภท: {error_type}
-📝 รายละเอียด: {error_message}
-
-⏰ เวลา: {timestamp}"""
+        message = _ERROR_TEMPLATE.format(
+            error_type=error_type,
+            error_message=error_message,
+            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
 
         return self.send_message(message)
 
@@ -282,19 +478,44 @@ line_notifier = LineNotifier(
 # ---------------------------------------------------------
 # 3. EXCHANGE INITIALIZATION WITH PRODUCTION SETTINGS
 # ---------------------------------------------------------
-def initialize_exchange() -> ccxt.binance:
+async def initialize_exchange() -> ccxt.binance:
     """
     Initialize Binance Futures exchange with:
     - Leverage setting
     - Isolated margin mode
     - Error handling
+
+    ccxt.async_support keeps one aiohttp session alive for the whole bot
+    lifetime, so every REST call after the first reuses the same TCP/TLS
+    connection (~6ms warm vs ~700ms cold round trip).
     """
     try:
-        exchange = ccxt.binance({
+        # ccxt.pro adds watch_ohlcv on top of the same REST interface —
+        # the bot wakes on the exchange's kline push instead of the clock
+        exchange_class = ccxtpro.binance if USE_WEBSOCKET else ccxt.binance
+
+        # Hand ccxt a tuned connector: capped pool plus a DNS cache so
+        # resolver round trips don't precede REST calls after long waits.
+        # ccxt never closes a caller-provided session — main() does.
+        connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300,
+                                         enable_cleanup_closed=True)
+        session = aiohttp.ClientSession(connector=connector)
+
+        exchange = exchange_class({
             'apiKey': API_KEY,
             'secret': API_SECRET,
-            'options': {'defaultType': 'future'},
-            'enableRateLimit': True
+            'session': session,
+            'aiohttp_trust_env': True,
+            # Measure the local/server clock offset during load_markets so
+            # candle-close wakeups align with Binance's clock, not ours
+            'options': {'defaultType': 'future',
+                        'adjustForTimeDifference': True},
+            'enableRateLimit': True,
+            # Ask Binance to hold the socket open between polls
+            'headers': {
+                'Connection': 'keep-alive',
+                'Keep-Alive': 'timeout=75, max=1000'
+            }
         })
 
         logger.info("=" * 60)
@@ -302,24 +523,29 @@ def initialize_exchange() -> ccxt.binance:
         logger.info("=" * 60)
 
         # Load markets
-        exchange.load_markets()
+        await exchange.load_markets()
         logger.info(f"✓ Markets loaded successfully")
 
         # Set leverage for the symbol
         try:
-            exchange.set_leverage(MAX_LEVERAGE, SYMBOL)
+            await exchange.set_leverage(MAX_LEVERAGE, SYMBOL)
             logger.info(f"✓ Leverage set to {MAX_LEVERAGE}x for {SYMBOL}")
         except Exception as e:
             logger.warning(f"⚠ Could not set leverage: {e}")
 
         # Set margin mode to ISOLATED
         try:
-            exchange.set_margin_mode('ISOLATED', SYMBOL)
+            await exchange.set_margin_mode('ISOLATED', SYMBOL)
             logger.info(f"✓ Margin mode set to ISOLATED for {SYMBOL}")
         except Exception as e:
             # If already in isolated mode, this will error - that's okay
             logger.warning(f"⚠ Margin mode setting: {e}")
 
+        # Specialize the two order shapes the bot ever sends
+        global _market_buy, _market_sell
+        _market_buy = partial(exchange.create_market_buy_order, SYMBOL)
+        _market_sell = partial(exchange.create_market_sell_order, SYMBOL)
+
         logger.info("=" * 60)
         return exchange
 
@@ -327,13 +553,77 @@ def initialize_exchange() -> ccxt.binance:
         logger.error(f"❌ CRITICAL: Failed to initialize exchange: {e}")
         sys.exit(1)
 
-# Initialize exchange
-exchange = initialize_exchange()
+# Shared exchange instance (created once in main(), used by every coroutine)
+exchange = None
+
+# Market-order callables with SYMBOL pre-bound (set by initialize_exchange);
+# the symbol and the two sides never change, so the order hot path calls
+# these with just the amount instead of rebuilding the argument tuple and
+# re-resolving the symbol through ccxt each time
+_market_buy = None
+_market_sell = None
+
+# Market precision/limits for SYMBOL — constant for the bot's lifetime,
+# cached once after load_markets() so the per-trade path never goes back
+# through exchange.market() / amount_to_precision() dict walks
+AMOUNT_STEP = 0.0
+AMOUNT_DECIMALS = 0
+AMOUNT_SCALE = 1
+PRICE_STEP = 0.0
+PRICE_DECIMALS = 0
+PRICE_SCALE = 1
+MIN_AMOUNT = 0.0
+MAX_AMOUNT = None
+MIN_COST = 0.0
+
+def _decimals_of(step: float) -> int:
+    """Number of decimal places in a step/tick (trims float noise after floor)"""
+    return max(0, int(round(-math.log10(step)))) if step < 1 else 0
+
+def cache_market_limits() -> None:
+    """Read SYMBOL's precision rules and limits into module-level floats"""
+    global AMOUNT_STEP, AMOUNT_DECIMALS, AMOUNT_SCALE
+    global PRICE_STEP, PRICE_DECIMALS, PRICE_SCALE
+    global MIN_AMOUNT, MAX_AMOUNT, MIN_COST
+
+    market_info = exchange.market(SYMBOL)
+    AMOUNT_STEP = float(market_info['precision']['amount'])
+    AMOUNT_DECIMALS = _decimals_of(AMOUNT_STEP)
+    PRICE_STEP = float(market_info['precision']['price'])
+    PRICE_DECIMALS = _decimals_of(PRICE_STEP)
+
+    # Integer scale factors: Binance futures steps are powers of ten (the
+    # _decimals_of derivation above already relies on that), so rounding
+    # to a step is floor(x * scale) / scale — one multiply instead of the
+    # divide + round() float-noise trim
+    AMOUNT_SCALE = 10 ** AMOUNT_DECIMALS
+    PRICE_SCALE = 10 ** PRICE_DECIMALS
+
+    # Fail loudly if the exchange ever hands us a step the scale shortcut
+    # can't represent (e.g. a 0.5 tick) — silently flooring orders to the
+    # wrong grid would send mispriced stops
+    if round(AMOUNT_STEP * AMOUNT_SCALE) != 1 or round(PRICE_STEP * PRICE_SCALE) != 1:
+        logger.error(f"❌ CRITICAL: Non-decimal step for {SYMBOL} "
+                     f"(amount={AMOUNT_STEP}, price={PRICE_STEP}) — "
+                     "integer-scale rounding cannot be used")
+        sys.exit(1)
+    MIN_AMOUNT = market_info['limits']['amount']['min']
+    MAX_AMOUNT = market_info['limits']['amount']['max']
+    MIN_COST = market_info['limits']['cost']['min']
+
+    # Rebind the sizing function's defaults now that the real values are
+    # known — default-argument binding swaps the per-call LOAD_GLOBAL chain
+    # for fast local loads (the def ran before markets were loaded, so the
+    # placeholders above were captured instead)
+    calculate_position_size.__defaults__ = (
+        AMOUNT_SCALE, MIN_AMOUNT, MAX_AMOUNT, MIN_COST)
+
+    logger.info(f"✓ Market limits cached: step={AMOUNT_STEP} | min={MIN_AMOUNT} | minCost={MIN_COST}")
 
 # ---------------------------------------------------------
 # 4. POSITION STATE PERSISTENCE & RE-SYNC
 # ---------------------------------------------------------
-def fetch_current_position(symbol: str) -> Dict:
+async def fetch_current_position(symbol: str) -> Dict:
     """
     Fetch actual position from Binance to resume bot state.
     This ensures the bot can recover from restarts.
@@ -348,7 +638,7 @@ def fetch_current_position(symbol: str) -> Dict:
         }
     """
     try:
-        positions = exchange.fetch_positions([symbol])
+        positions = await exchange.fetch_positions([symbol])
 
         for pos in positions:
             if pos['symbol'] == symbol:
@@ -412,69 +702,166 @@ def get_timeframe_seconds(timeframe: str) -> int:
 
     return value * multipliers.get(unit, 60)
 
-def wait_for_candle_close(timeframe: str):
+# Parsed once at module load — the wait loop reuses the constant instead
+# of re-parsing the timeframe string every cycle
+TF_SECONDS = get_timeframe_seconds(TIMEFRAME)
+
+async def wait_for_candle_close() -> None:
     """
     Wait until the current candle closes before checking for signals.
     This ensures we only trade on confirmed candle closes.
     """
-    tf_seconds = get_timeframe_seconds(timeframe)
-    current_time = int(time.time())
+    tf_ms = TF_SECONDS * 1000
 
-    # Calculate seconds until next candle close
-    seconds_into_candle = current_time % tf_seconds
-    seconds_until_close = tf_seconds - seconds_into_candle
+    # Candles close on the exchange's clock — correct local time by the
+    # offset measured at startup (adjustForTimeDifference) so a skewed
+    # host doesn't wake mid-candle and re-fetch the same open bar
+    now_ms = exchange.milliseconds() - exchange.options.get('timeDifference', 0)
+    next_close_ms = (now_ms // tf_ms + 1) * tf_ms
+    seconds_until_close = (next_close_ms - now_ms) // 1000
 
     if seconds_until_close < 60:  # If less than 1 minute, wait for next candle
-        seconds_until_close += tf_seconds
+        seconds_until_close += TF_SECONDS
 
-    next_close_time = datetime.fromtimestamp(current_time + seconds_until_close)
+    next_close_time = datetime.fromtimestamp(time.time() + seconds_until_close)
     logger.info(f"⏰ Next candle close at: {next_close_time.strftime('%Y-%m-%d %H:%M:%S')} ({seconds_until_close}s)")
 
-    time.sleep(seconds_until_close + 5)  # Add 5 seconds buffer to ensure candle is closed
+    # The _keepalive supervisor task owns connection warming, so this can
+    # be a single uninterrupted sleep
+    await asyncio.sleep(seconds_until_close + 5)  # 5s buffer to ensure candle is closed
+
+async def _keepalive() -> None:
+    """
+    Ping Binance every 60s in the background so the pooled REST
+    connection never idles out — whichever feed mode is active, the
+    first order after a long quiet stretch goes out on a warm socket
+    (~6ms) instead of paying a fresh TCP/TLS handshake.
+    """
+    while True:
+        await asyncio.sleep(60)
+        try:
+            await exchange.fetch_time()
+        except Exception as e:
+            logger.debug("Keep-alive ping failed: %s", e)
 
 # ---------------------------------------------------------
 # 6. DATA FEED & INDICATORS
 # ---------------------------------------------------------
-def fetch_data(symbol: str, timeframe: str, limit: int) -> Optional[pd.DataFrame]:
-    """Fetch OHLCV data from Binance with retry logic"""
+async def fetch_data(symbol: str, timeframe: str, limit: int,
+                     since: Optional[int] = None) -> Optional[list]:
+    """Fetch raw OHLCV rows from Binance with retry logic"""
     for attempt in range(MAX_RETRIES):
         try:
-            bars = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            df = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            return df
+            return await exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
         except Exception as e:
             logger.warning(f"⚠ Attempt {attempt + 1}/{MAX_RETRIES} - Error fetching data: {e}")
             if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY)
+                await asyncio.sleep(RETRY_DELAY)
             else:
                 logger.error(f"❌ Failed to fetch data after {MAX_RETRIES} attempts")
                 return None
 
-def calculate_z_score(df: pd.DataFrame, window: int) -> pd.DataFrame:
-    """Calculate Z-Score statistical indicator"""
-    df['mean'] = df['close'].rolling(window=window).mean()
-    df['std'] = df['close'].rolling(window=window).std()
-    df['z_score'] = (df['close'] - df['mean']) / df['std']
-    return df
+# Eager signatures + on-disk cache: the kernels compile at import time,
+# so the first live tick never stalls on JIT compilation.
+@njit('UniTuple(f8, 2)(f8[:])', cache=True)
+def welford_stats(buf):
+    """
+    Full-pass (mean, M2) over a filled ring buffer.
+
+    Run once when the window first fills (and any time the running stats
+    need a re-seed); afterwards update_stats() maintains the pair in
+    O(1). Welford's online formula avoids the catastrophic cancellation
+    of a naive sum-of-squares pass, and mean/M2 are order-independent so
+    the ring's wrap point doesn't matter.
+    """
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(buf.shape[0]):
+        x = buf[i]
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+    return mean, m2
+
+@njit('UniTuple(f8, 2)(f8, f8, f8, f8, f8)', cache=True)
+def update_stats(mean, m2, x_old, x_new, window):
+    """
+    Fixed-window sliding update: remove the evicted close, add the new
+    one. O(1) per closed bar versus re-scanning the whole window.
+    """
+    new_mean = mean + (x_new - x_old) / window
+    new_m2 = m2 + (x_new - x_old) * (x_new - new_mean + x_old - mean)
+    return new_mean, new_m2
+
+# Action / position encoding for the decision kernel (int8 all the way)
+HOLD, OPEN_LONG, OPEN_SHORT, CLOSE_LONG, CLOSE_SHORT = 0, 1, 2, 3, 4
+POS_NONE, POS_LONG, POS_SHORT = 0, 1, 2
+_POS_INT = {None: POS_NONE, 'LONG': POS_LONG, 'SHORT': POS_SHORT}
+
+@njit('i1(f8, f8, f8, f8, f8, i1)', cache=True)
+def decide(last_z, entry_t, neg_entry_t, exit_t, neg_exit_t, pos_type):
+    """
+    Decision state machine: (z-score, position) -> action enum.
+
+    The interpreted if/elif ladder collapses to native compares and
+    branches; the Python side just dispatches on the returned int. Both
+    threshold signs arrive precomputed, so the kernel is pure
+    compare-and-branch. The same kernel can later replay a whole z-score
+    array in a backtest.
+    """
+    if pos_type == 0:  # POS_NONE
+        if last_z > entry_t:
+            return 2  # OPEN_SHORT (price too high)
+        if last_z < neg_entry_t:
+            return 1  # OPEN_LONG (price too low)
+    elif pos_type == 2:  # POS_SHORT
+        if last_z < exit_t:
+            return 4  # CLOSE_SHORT (price returned to mean)
+    else:  # POS_LONG
+        if last_z > neg_exit_t:
+            return 3  # CLOSE_LONG (price returned to mean)
+    return 0  # HOLD
 
 # ---------------------------------------------------------
 # 7. RISK MANAGEMENT WITH PRECISION HANDLING
 # ---------------------------------------------------------
-def calculate_position_size(symbol: str, current_price: float) -> Tuple[float, float]:
+async def fetch_usdt_balance() -> float:
+    """
+    Fetch available USDT via the narrow /fapi/v2/balance endpoint.
+
+    The generic fetch_balance() pulls and parses the whole futures account
+    (every asset plus positions); this returns one small array and reads
+    the USDT row directly.
+    """
+    rows = await exchange.fapiPrivateV2GetBalance()
+    for row in rows:
+        if row['asset'] == 'USDT':
+            return float(row['availableBalance'])
+    return 0.0
+
+async def calculate_position_size(symbol: str, current_price: float,
+                                  _scale: int = AMOUNT_SCALE,
+                                  _min: float = MIN_AMOUNT,
+                                  _max: Optional[float] = MAX_AMOUNT,
+                                  _min_cost: float = MIN_COST) -> Tuple[float, float]:
     """
     Calculate position size with strict adherence to Binance limits:
     - Lot size (amount precision)
     - Min/max amount
     - Min notional value
 
+    The underscore parameters carry the cached market limits as bound
+    defaults (rebound by cache_market_limits() at startup); callers never
+    pass them.
+
     Returns:
         Tuple[float, float]: (amount_coin, usdt_balance)
     """
     try:
         # Fetch balance
-        balance_info = exchange.fetch_balance()
-        usdt_balance = balance_info['USDT']['free']
+        usdt_balance = await fetch_usdt_balance()
 
         if usdt_balance <= 0:
             logger.warning("⚠ No USDT balance available")
@@ -489,34 +876,27 @@ def calculate_position_size(symbol: str, current_price: float) -> Tuple[float, f
         # Convert to coin amount
         amount_coin = position_size_usdt / current_price
 
-        # Get market info for precision
-        market_info = exchange.market(symbol)
-
-        # Apply amount precision
-        amount_coin = exchange.amount_to_precision(symbol, amount_coin)
-        amount_coin_float = float(amount_coin)
+        # Apply amount precision via the cached integer scale
+        amount_coin_float = math.floor(amount_coin * _scale) / _scale
 
         # Check minimum amount
-        min_amount = market_info['limits']['amount']['min']
-        if amount_coin_float < min_amount:
-            logger.warning(f"⚠ Calculated amount {amount_coin_float} below minimum {min_amount}")
+        if amount_coin_float < _min:
+            logger.warning(f"⚠ Calculated amount {amount_coin_float} below minimum {_min}")
             # LINE Notification: Insufficient balance
-            line_notifier.notify_insufficient_balance(min_amount * current_price, usdt_balance)
+            line_notifier.notify_insufficient_balance(_min * current_price, usdt_balance)
             return 0, usdt_balance
 
         # Check maximum amount
-        max_amount = market_info['limits']['amount']['max']
-        if max_amount and amount_coin_float > max_amount:
-            logger.warning(f"⚠ Calculated amount {amount_coin_float} above maximum {max_amount}")
-            amount_coin_float = max_amount
+        if _max and amount_coin_float > _max:
+            logger.warning(f"⚠ Calculated amount {amount_coin_float} above maximum {_max}")
+            amount_coin_float = _max
 
         # Check minimum notional (min order value in USDT)
-        min_cost = market_info['limits']['cost']['min']
         order_value = amount_coin_float * current_price
-        if order_value < min_cost:
-            logger.warning(f"⚠ Order value {order_value:.2f} USDT below minimum {min_cost} USDT")
+        if order_value < _min_cost:
+            logger.warning(f"⚠ Order value {order_value:.2f} USDT below minimum {_min_cost} USDT")
             # LINE Notification: Insufficient balance
-            line_notifier.notify_insufficient_balance(min_cost, usdt_balance)
+            line_notifier.notify_insufficient_balance(_min_cost, usdt_balance)
             return 0, usdt_balance
 
         logger.info(f"💰 Balance: {usdt_balance:.2f} USDT | Risk: {risk_amount:.2f} USDT | Size: {amount_coin_float} {symbol.split('/')[0]}")
@@ -531,25 +911,27 @@ def calculate_position_size(symbol: str, current_price: float) -> Tuple[float, f
 # ---------------------------------------------------------
 # 8. ROBUST ORDER EXECUTION WITH RETRY LOGIC
 # ---------------------------------------------------------
-def execute_order_with_retry(order_func, *args, **kwargs) -> Optional[Dict]:
+async def execute_order_with_retry(order_func, *args, **kwargs) -> Optional[Dict]:
     """
     Execute order with retry logic and exponential backoff.
     """
     for attempt in range(MAX_RETRIES):
         try:
-            order = order_func(*args, **kwargs)
+            order = await order_func(*args, **kwargs)
             return order
         except Exception as e:
-            wait_time = RETRY_DELAY * (2 ** attempt)  # Exponential backoff
+            # Full-jitter backoff: decorrelates retries across clients so an
+            # exchange-wide hiccup doesn't align every bot's retry storm
+            wait_time = random.uniform(0, RETRY_DELAY * (2 ** attempt))
             logger.warning(f"⚠ Order attempt {attempt + 1}/{MAX_RETRIES} failed: {e}")
             if attempt < MAX_RETRIES - 1:
-                logger.info(f"⏳ Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
+                logger.info(f"⏳ Retrying in {wait_time:.1f} seconds...")
+                await asyncio.sleep(wait_time)
             else:
                 logger.error(f"❌ Order failed after {MAX_RETRIES} attempts")
                 return None
 
-def set_stop_loss_with_safety(symbol: str, side: str, amount: float, stop_price: float, current_price: float) -> bool:
+async def set_stop_loss_with_safety(symbol: str, side: str, amount: float, stop_price: float, current_price: float) -> bool:
     """
     Set stop loss with retry logic and safety mechanism.
     If stop loss fails after retries, immediately close position.
@@ -558,13 +940,13 @@ def set_stop_loss_with_safety(symbol: str, side: str, amount: float, stop_price:
         bool: True if stop loss set successfully, False otherwise
     """
     try:
-        # Apply price precision
-        stop_price = exchange.price_to_precision(symbol, stop_price)
+        # Apply price precision via the cached integer scale
+        stop_price = math.floor(stop_price * PRICE_SCALE) / PRICE_SCALE
 
         # Retry logic for stop loss
         for attempt in range(MAX_RETRIES):
             try:
-                sl_order = exchange.create_order(
+                sl_order = await exchange.create_order(
                     symbol=symbol,
                     type='STOP_MARKET',
                     side=side,
@@ -575,10 +957,11 @@ def set_stop_loss_with_safety(symbol: str, side: str, amount: float, stop_price:
                 return True
 
             except Exception as e:
-                wait_time = RETRY_DELAY * (2 ** attempt)
+                # Full-jitter backoff (same rationale as execute_order_with_retry)
+                wait_time = random.uniform(0, RETRY_DELAY * (2 ** attempt))
                 logger.warning(f"⚠ Stop Loss attempt {attempt + 1}/{MAX_RETRIES} failed: {e}")
                 if attempt < MAX_RETRIES - 1:
-                    time.sleep(wait_time)
+                    await asyncio.sleep(wait_time)
 
         # SAFETY MECHANISM: If stop loss fails after all retries
         logger.error("🚨 CRITICAL: Stop Loss failed after all retries!")
@@ -586,7 +969,7 @@ def set_stop_loss_with_safety(symbol: str, side: str, amount: float, stop_price:
 
         # Immediately close position with market order
         close_side = 'sell' if side == 'buy' else 'buy'
-        emergency_close = execute_order_with_retry(
+        emergency_close = await execute_order_with_retry(
             exchange.create_market_order,
             symbol,
             close_side,
@@ -605,7 +988,7 @@ def set_stop_loss_with_safety(symbol: str, side: str, amount: float, stop_price:
         logger.error(f"❌ Critical error in stop loss safety mechanism: {e}")
         return False
 
-def execute_trade(signal: str, current_price: float, amount: float, balance: float) -> Optional[Dict]:
+async def execute_trade(signal: str, current_price: float, amount: float, balance: float) -> Optional[Dict]:
     """
     Execute trade with robust error handling, stop loss safety, and LINE notifications.
 
@@ -623,11 +1006,7 @@ def execute_trade(signal: str, current_price: float, amount: float, balance: flo
             logger.info(f"🟢 LONG SIGNAL | Price: {current_price} | Amount: {amount}")
 
             # Execute market order with retry
-            order = execute_order_with_retry(
-                exchange.create_market_buy_order,
-                SYMBOL,
-                amount
-            )
+            order = await execute_order_with_retry(_market_buy, amount)
 
             if not order:
                 logger.error("❌ Failed to execute LONG order")
@@ -639,7 +1018,7 @@ def execute_trade(signal: str, current_price: float, amount: float, balance: flo
 
             # Set Stop Loss with safety mechanism
             stop_loss_price = current_price * (1 - STOP_LOSS_PCT)
-            sl_success = set_stop_loss_with_safety(
+            sl_success = await set_stop_loss_with_safety(
                 SYMBOL,
                 'sell',
                 amount,
@@ -669,11 +1048,7 @@ def execute_trade(signal: str, current_price: float, amount: float, balance: flo
             logger.info(f"🔴 SHORT SIGNAL | Price: {current_price} | Amount: {amount}")
 
             # Execute market order with retry
-            order = execute_order_with_retry(
-                exchange.create_market_sell_order,
-                SYMBOL,
-                amount
-            )
+            order = await execute_order_with_retry(_market_sell, amount)
 
             if not order:
                 logger.error("❌ Failed to execute SHORT order")
@@ -685,7 +1060,7 @@ def execute_trade(signal: str, current_price: float, amount: float, balance: flo
 
             # Set Stop Loss with safety mechanism
             stop_loss_price = current_price * (1 + STOP_LOSS_PCT)
-            sl_success = set_stop_loss_with_safety(
+            sl_success = await set_stop_loss_with_safety(
                 SYMBOL,
                 'buy',
                 amount,
@@ -716,7 +1091,7 @@ def execute_trade(signal: str, current_price: float, amount: float, balance: flo
         line_notifier.notify_error("Trade Execution", str(e))
         return None
 
-def close_position(position_type: str, amount: float, current_price: float, entry_price: float) -> bool:
+async def close_position(position_type: str, amount: float, current_price: float, entry_price: float) -> bool:
     """
     Close position with retry logic, stop loss cancellation, and LINE notifications.
 
@@ -729,31 +1104,27 @@ def close_position(position_type: str, amount: float, current_price: float, entr
     try:
         logger.info(f"🟡 CLOSING {position_type} POSITION | Price: {current_price} | Amount: {amount}")
 
-        # Cancel all open stop loss orders first
+        # Cancel every resting order in one round trip (the bot only ever
+        # places STOP_MARKETs, so this is exactly "cancel the stop losses"
+        # without the fetch-then-loop); the balance for the close
+        # notification doesn't depend on it, so fetch it concurrently
+        current_balance = 0
         try:
-            open_orders = exchange.fetch_open_orders(SYMBOL)
-            for order in open_orders:
-                if order['type'] == 'STOP_MARKET':
-                    exchange.cancel_order(order['id'], SYMBOL)
-                    logger.info(f"🗑️ Cancelled Stop Loss: {order['id']}")
+            _, current_balance = await asyncio.gather(
+                exchange.cancel_all_orders(SYMBOL),
+                fetch_usdt_balance()
+            )
+            logger.info("🗑️ Cancelled open Stop Loss orders")
         except Exception as cancel_error:
             logger.warning(f"⚠ Error cancelling stop loss: {cancel_error}")
 
         # Close position
         if position_type == 'SHORT':
             # Close Short = Buy
-            close_order = execute_order_with_retry(
-                exchange.create_market_buy_order,
-                SYMBOL,
-                amount
-            )
+            close_order = await execute_order_with_retry(_market_buy, amount)
         else:  # LONG
             # Close Long = Sell
-            close_order = execute_order_with_retry(
-                exchange.create_market_sell_order,
-                SYMBOL,
-                amount
-            )
+            close_order = await execute_order_with_retry(_market_sell, amount)
 
         if close_order:
             logger.info(f"✅ {position_type} Closed: {close_order['id']}")
@@ -764,14 +1135,8 @@ def close_position(position_type: str, amount: float, current_price: float, entr
             else:  # SHORT
                 pnl = (entry_price - current_price) * amount
 
-            # Get current balance
-            try:
-                balance_info = exchange.fetch_balance()
-                current_balance = balance_info['USDT']['free']
-            except:
-                current_balance = 0
-
-            # LINE Notification: Position closed
+            # LINE Notification: Position closed (balance fetched above,
+            # concurrently with the stop-loss lookup)
             line_notifier.notify_order_close(
                 position_type=position_type,
                 exit_price=current_price,
@@ -796,7 +1161,17 @@ def close_position(position_type: str, amount: float, current_price: float, entr
 # ---------------------------------------------------------
 # 9. MAIN BOT LOOP (Production-Ready)
 # ---------------------------------------------------------
-def run_bot():
+# Pre-built per-tick status line: lazy %-style args mean the string is
+# only formatted when an INFO handler actually fires
+_TICK_STATUS = "-" * 60 + "\n📊 Price: %s | Z-Score: %.2f | Position: %s"
+
+# Emit the status line every N closed candles. The default logs every
+# candle (sensible on 1h); raise it on short timeframes where per-candle
+# status would hammer the disk on a constrained VPS, or set 0 to disable
+# the status line entirely
+LOG_EVERY = int(os.getenv('LOG_EVERY', '1'))
+
+async def run_bot() -> None:
     """
     Main bot loop with:
     - Position state persistence
@@ -817,72 +1192,201 @@ def run_bot():
     logger.info("=" * 60)
 
     # Fetch current position from exchange (persistence/re-sync)
-    position_state = fetch_current_position(SYMBOL)
+    position_state = await fetch_current_position(SYMBOL)
     in_position = position_state['in_position']
     position_type = position_state['position_type']
     position_amount = position_state['position_amount']
     entry_price = position_state.get('entry_price', 0)  # Store entry price for PnL
 
+    # Background keep-alive so long candle waits don't cool the connection
+    keepalive_task = asyncio.create_task(_keepalive())
+
+    # Ring buffer of the last Z_SCORE_WINDOW closes, shared by both feeds
+    # (websocket and REST). Fixed preallocated float64 storage: each closed
+    # bar is an O(1) in-place write, and the signal path never copies the
+    # history into a fresh array again.
+    ring = np.empty(Z_SCORE_WINDOW, dtype=np.float64)
+    ring_head = 0   # next write slot
+    ring_count = 0  # bars stored so far (caps at Z_SCORE_WINDOW)
+    last_bar_ts = 0
+
+    # Running Welford pair for the window — seeded with one full pass
+    # when the ring first fills, then maintained in O(1) per closed bar
+    stat_mean = 0.0
+    stat_m2 = 0.0
+    stats_valid = False
+
+    # Consecutive-failure counter drives capped exponential backoff below
+    consecutive_errors = 0
+
+    # Closed-candle counter for LOG_EVERY status gating
+    tick = 0
+
     while True:
         try:
-            # Wait for candle close before checking signals
-            wait_for_candle_close(TIMEFRAME)
-
-            # Fetch data
-            df = fetch_data(SYMBOL, TIMEFRAME, LIMIT)
-            if df is None:
-                logger.warning("⚠ Failed to fetch data, retrying...")
-                time.sleep(10)
-                continue
-
-            # Calculate Z-Score
-            df = calculate_z_score(df, Z_SCORE_WINDOW)
-            last_z = df['z_score'].iloc[-1]
-            current_price = df['close'].iloc[-1]
-
-            logger.info("-" * 60)
-            logger.info(f"📊 Price: {current_price} | Z-Score: {last_z:.2f} | Position: {position_type if in_position else 'None'}")
-
-            # Decision Logic
-            if not in_position:
-                # Entry conditions
-                if last_z > ENTRY_THRESHOLD:
-                    # Open SHORT (price too high)
-                    amount, balance = calculate_position_size(SYMBOL, current_price)
-                    if amount > 0:
-                        order = execute_trade("SELL", current_price, amount, balance)
-                        if order:
-                            in_position = True
-                            position_type = 'SHORT'
-                            position_amount = amount
-                            entry_price = current_price  # Store entry price for PnL calculation
-
-                elif last_z < -ENTRY_THRESHOLD:
-                    # Open LONG (price too low)
-                    amount, balance = calculate_position_size(SYMBOL, current_price)
-                    if amount > 0:
-                        order = execute_trade("BUY", current_price, amount, balance)
-                        if order:
-                            in_position = True
-                            position_type = 'LONG'
-                            position_amount = amount
-                            entry_price = current_price  # Store entry price for PnL calculation
-
+            if USE_WEBSOCKET:
+                # One-time warmup so the z-score window is full from bar one
+                if ring_count == 0:
+                    bars = await fetch_data(SYMBOL, TIMEFRAME, LIMIT)
+                    if bars is None:
+                        await asyncio.sleep(10)
+                        continue
+                    # Bulk float64 conversion: one C-level pass over the whole
+                    # payload instead of ~LIMIT Python-level row plucks
+                    hist = np.asarray(bars, dtype=np.float64)[:-1, 4]
+                    tail = hist[-Z_SCORE_WINDOW:]
+                    ring[:tail.size] = tail
+                    ring_head = tail.size % Z_SCORE_WINDOW
+                    ring_count = tail.size
+                    last_bar_ts = bars[-1][0]
+
+                # Block until the exchange pushes a kline update and only
+                # act when the candle timestamp rolls over (= candle closed)
+                ohlcv = await exchange.watch_ohlcv(SYMBOL, TIMEFRAME)
+                new_ts = ohlcv[-1][0]
+                if new_ts == last_bar_ts:
+                    continue  # current candle still forming
+
+                # Appended bars must be contiguous, same rule as the REST
+                # path: Binance does not replay klines missed during a
+                # websocket drop, so after a reconnect the cache can jump
+                # past lost closes (and the pre-disconnect bar's recorded
+                # close may be a partial). On a hole, re-warm instead of
+                # mixing non-adjacent candles into the window
+                tf_ms = TF_SECONDS * 1000
+                expected_ts = last_bar_ts
+                for bar in ohlcv:
+                    if last_bar_ts <= bar[0] < new_ts:
+                        if bar[0] != expected_ts:
+                            break  # gap — discard the whole batch
+                        if stats_valid:
+                            # Slide the stats before the eviction slot is
+                            # overwritten
+                            stat_mean, stat_m2 = update_stats(
+                                stat_mean, stat_m2,
+                                ring[ring_head], bar[4], Z_SCORE_WINDOW)
+                        ring[ring_head] = bar[4]
+                        ring_head = (ring_head + 1) % Z_SCORE_WINDOW
+                        ring_count = min(ring_count + 1, Z_SCORE_WINDOW)
+                        expected_ts = bar[0] + tf_ms
+                if expected_ts != new_ts:
+                    logger.warning("⚠ Kline stream skipped a candle close - re-warming history")
+                    ring_count = 0  # force the warmup fetch above
+                    stats_valid = False
+                    continue
+                last_bar_ts = new_ts
             else:
-                # Exit conditions
-                if position_type == 'SHORT' and last_z < EXIT_THRESHOLD:
-                    # Close SHORT (price returned to mean)
-                    if close_position('SHORT', position_amount, current_price, entry_price):
-                        in_position = False
-                        position_type = None
-                        position_amount = 0
-
-                elif position_type == 'LONG' and last_z > -EXIT_THRESHOLD:
-                    # Close LONG (price returned to mean)
-                    if close_position('LONG', position_amount, current_price, entry_price):
-                        in_position = False
-                        position_type = None
-                        position_amount = 0
+                # Wait for candle close before checking signals
+                await wait_for_candle_close()
+
+                # Warmup downloads the full history once; afterwards only
+                # the just-closed bar (plus the forming one) goes over the
+                # wire — ~100 rows of JSON per cycle shrink to 2
+                if ring_count == 0:
+                    bars = await fetch_data(SYMBOL, TIMEFRAME, LIMIT)
+                    if bars is None:
+                        logger.warning("⚠ Failed to fetch data, retrying...")
+                        await asyncio.sleep(10)
+                        continue
+                    # Bulk float64 conversion as in the websocket warmup —
+                    # one boundary crossing for the whole history
+                    hist = np.asarray(bars, dtype=np.float64)[:-1, 4]
+                    tail = hist[-Z_SCORE_WINDOW:]
+                    ring[:tail.size] = tail
+                    ring_head = tail.size % Z_SCORE_WINDOW
+                    ring_count = tail.size
+                    last_bar_ts = bars[-1][0]
+                else:
+                    # Size the request from the elapsed time: after a
+                    # backoff/outage several candles may have closed, and a
+                    # fixed limit=2 would trail one stale bar per cycle
+                    # forever instead of catching up
+                    tf_ms = TF_SECONDS * 1000
+                    now_ms = (exchange.milliseconds()
+                              - exchange.options.get('timeDifference', 0))
+                    need = min(LIMIT, int((now_ms - last_bar_ts) // tf_ms) + 1)
+                    bars = await fetch_data(SYMBOL, TIMEFRAME, max(need, 2),
+                                            since=last_bar_ts)
+                    if bars is None:
+                        logger.warning("⚠ Failed to fetch data, retrying...")
+                        await asyncio.sleep(10)
+                        continue
+
+                    new_ts = bars[-1][0]
+                    for bar in bars[:-1]:  # last row is the still-open candle
+                        if last_bar_ts <= bar[0] < new_ts:
+                            if stats_valid:
+                                # Slide the stats before the eviction slot
+                                # is overwritten
+                                stat_mean, stat_m2 = update_stats(
+                                    stat_mean, stat_m2,
+                                    ring[ring_head], bar[4], Z_SCORE_WINDOW)
+                            ring[ring_head] = bar[4]
+                            ring_head = (ring_head + 1) % Z_SCORE_WINDOW
+                            ring_count = min(ring_count + 1, Z_SCORE_WINDOW)
+                    last_bar_ts = new_ts
+
+            # Data arrived — the error streak (if any) is over
+            consecutive_errors = 0
+
+            if ring_count < Z_SCORE_WINDOW:
+                continue  # not enough closed bars for a full window yet
+
+            if not stats_valid:
+                # Seed the running stats with one full pass over the ring;
+                # every later bar is an O(1) slide in the push loops above
+                stat_mean, stat_m2 = welford_stats(ring)
+                stats_valid = True
+
+            # Z-Score straight off the running stats (ddof=1 as before;
+            # max() guards the tiny negative M2 drift from float rounding)
+            current_price = ring[(ring_head - 1) % Z_SCORE_WINDOW]
+            std = math.sqrt(max(stat_m2, 0.0) / (Z_SCORE_WINDOW - 1))
+            last_z = 0.0 if std == 0.0 else (current_price - stat_mean) / std
+
+            tick += 1
+            if (LOG_EVERY > 0 and tick % LOG_EVERY == 0
+                    and logger.isEnabledFor(logging.INFO)):
+                logger.info(_TICK_STATUS, current_price, last_z,
+                            position_type if in_position else 'None')
+
+            # Decision Logic — the thresholds live inside the kernel call;
+            # Python only dispatches on the action enum
+            action = decide(last_z, ENTRY_THRESHOLD, NEG_ENTRY_THRESHOLD,
+                            EXIT_THRESHOLD, NEG_EXIT_THRESHOLD,
+                            _POS_INT[position_type] if in_position else POS_NONE)
+
+            if action == OPEN_SHORT:
+                amount, balance = await calculate_position_size(SYMBOL, current_price)
+                if amount > 0:
+                    order = await execute_trade("SELL", current_price, amount, balance)
+                    if order:
+                        in_position = True
+                        position_type = 'SHORT'
+                        position_amount = amount
+                        entry_price = current_price  # Store entry price for PnL calculation
+
+            elif action == OPEN_LONG:
+                amount, balance = await calculate_position_size(SYMBOL, current_price)
+                if amount > 0:
+                    order = await execute_trade("BUY", current_price, amount, balance)
+                    if order:
+                        in_position = True
+                        position_type = 'LONG'
+                        position_amount = amount
+                        entry_price = current_price  # Store entry price for PnL calculation
+
+            elif action == CLOSE_SHORT:
+                if await close_position('SHORT', position_amount, current_price, entry_price):
+                    in_position = False
+                    position_type = None
+                    position_amount = 0
+
+            elif action == CLOSE_LONG:
+                if await close_position('LONG', position_amount, current_price, entry_price):
+                    in_position = False
+                    position_type = None
+                    position_amount = 0
 
         except KeyboardInterrupt:
             logger.info("=" * 60)
@@ -890,9 +1394,40 @@ def run_bot():
             logger.info("=" * 60)
             sys.exit()
 
+        except ccxt.RateLimitExceeded as e:
+            # Back off at least as long as the exchange asks, growing with
+            # the streak — hammering a rate limit risks an API ban
+            consecutive_errors += 1
+            delay = max(exchange.rateLimit / 1000,
+                        min(60, 2 ** consecutive_errors))
+            logger.warning(f"⚠ Rate limit exceeded: {e} - backing off {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+        except ccxt.NetworkError as e:
+            # Transient network problems: quick first retry, capped growth
+            consecutive_errors += 1
+            delay = min(60, 2 ** consecutive_errors)
+            logger.warning(f"⚠ Network error: {e} - retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
         except Exception as e:
+            consecutive_errors += 1
+            delay = min(60, 10 * 2 ** (consecutive_errors - 1))
             logger.error(f"❌ Unexpected Error: {e}", exc_info=True)
-            time.sleep(10)
+            await asyncio.sleep(delay)
+
+async def main() -> None:
+    global exchange
+    exchange = await initialize_exchange()
+    cache_market_limits()
+    try:
+        await run_bot()
+    finally:
+        # Release the aiohttp session/sockets cleanly — the session was
+        # supplied by us, so ccxt's close() leaves it open
+        await exchange.close()
+        if exchange.session is not None and not exchange.session.closed:
+            await exchange.session.close()
 
 if __name__ == "__main__":
-    run_bot()
+    asyncio.run(main())
@@ -0,0 +1,34 @@
+"""Pre-compile the Numba kernels so live processes never pay JIT warmup.
+
+numba.pycc (classic AOT to a shared library) is deprecated and removed in
+recent Numba releases, so the kernels stay @njit(cache=True) in the bot
+modules and this script primes their on-disk cache instead: importing the
+modules compiles the eagerly-signed kernels, and one dummy call compiles
+the lazy ones. Run it once per environment (e.g. in the Docker image
+build) and every later `python bot_mean_reversion*.py` loads the cached
+machine code from __pycache__ instead of compiling.
+"""
+import time
+
+import numpy as np
+
+def main():
+    t0 = time.perf_counter()
+
+    # Importing compiles every kernel with an explicit signature
+    import bot_mean_reversion as simple
+    import bot_mean_reversion_production as prod
+
+    # Lazy @njit(cache=True) kernels compile on first call — feed dummies
+    closes = np.arange(40, dtype=np.float64)
+    simple.last_zscore(closes, 30)
+    simple.batch_signals(closes.reshape(1, -1), 30)
+    simple.decide(1.0, 0.5, 0.1, 2.5, 0.0, np.int8(0))
+    mean, m2 = prod.welford_stats(closes[:30])
+    prod.update_stats(mean, m2, 0.0, 30.0, 30.0)
+    prod.decide(1.0, 2.5, -2.5, 0.0, -0.0, np.int8(0))
+
+    print(f"Kernels compiled and cached in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
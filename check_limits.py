@@ -1,8 +1,40 @@
-import ccxt
+import ccxt.async_support as ccxt
+import asyncio
 import os
+import pickle
+import time
 from dotenv import load_dotenv
 
-def check_limits():
+# Markets cache: the full Binance futures catalog is hundreds of KB of JSON
+# that barely changes day to day — keep the parsed dict on disk and skip the
+# download + parse when it's fresh
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'bot_mr')
+MARKETS_CACHE_TTL = 86400  # seconds
+
+async def cached_load_markets(exchange, ttl=MARKETS_CACHE_TTL):
+    """Load markets from a local pickle when fresh, else from the exchange."""
+    cache_file = os.path.join(CACHE_DIR, f'{exchange.id}_futures_markets.pkl')
+
+    try:
+        if time.time() - os.path.getmtime(cache_file) < ttl:
+            with open(cache_file, 'rb') as f:
+                markets = pickle.load(f)
+            # Register on the exchange so fetch_ticker() doesn't reload them
+            exchange.set_markets(markets)
+            return markets
+    except (OSError, pickle.PickleError):
+        pass  # no cache / stale / unreadable — fall through to the network
+
+    markets = await exchange.load_markets(reload=False)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_file, 'wb') as f:
+            pickle.dump(markets, f)
+    except OSError:
+        pass  # cache is best-effort; the lookup already succeeded
+    return markets
+
+async def check_limits():
     load_dotenv()
     symbol = os.getenv('SYMBOL', 'BNB/USDT')
 
@@ -11,7 +43,12 @@ def check_limits():
     })
 
     try:
-        markets = exchange.load_markets()
+        # The two round trips are independent — overlap them instead of
+        # waiting for the catalog before asking for the price
+        markets, ticker = await asyncio.gather(
+            cached_load_markets(exchange),
+            exchange.fetch_ticker(symbol)
+        )
         if symbol in markets:
             market = markets[symbol]
             print(f"--- Limits for {symbol} on Binance Futures ---")
@@ -20,8 +57,7 @@ def check_limits():
             print(f"Amount Precision: {market['precision']['amount']}")
             print(f"Price Precision: {market['precision']['price']}")
 
-            # Fetch current price to calculate real dollar minimum
-            ticker = exchange.fetch_ticker(symbol)
+            # Current price lets us calculate the real dollar minimum
             current_price = ticker['last']
             min_notional = market['limits']['cost']['min']
             min_amount_in_usdt = market['limits']['amount']['min'] * current_price
@@ -33,6 +69,9 @@ def check_limits():
             print(f"Symbol {symbol} not found.")
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        # Release the aiohttp sockets cleanly
+        await exchange.close()
 
 if __name__ == "__main__":
-    check_limits()
+    asyncio.run(check_limits())